@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of date parsing and title cleaning, comparing date_utils with the original implementation
+
+Usage: python -m benchmarks.bench_date_utils [--number N] [--json PATH]
+"""
+
+import argparse
+import json
+import re
+import timeit
+from datetime import datetime, timezone
+
+from benchmarks.replay import FIXTURES_DIR
+from feed_generators import date_utils
+from feed_generators.html_utils import make_soup
+
+# Date strings in the shapes seen on the listing and article pages
+DATE_SAMPLES = [
+    '2025-12-18T09:00:00+00:00',
+    '2025-12-18T09:00:00Z',
+    '2025-12-18',
+    '18 December 2025',
+    '01 Jun 2025',
+    'December 18, 2025',
+    'Dec 18, 2025',
+    '12/18/2025',
+    '18/12/2025',
+    'Authors',
+    '',
+]
+
+TITLE_SAMPLES = [
+    '10 March 2025Gemini 3 Flash: frontier intelligence built for speed',
+    'AuPair: Golden Example Pairs for Code Repair (2025)',
+    'Performance Prediction for Large Systems - 2025',
+    'Rethinking Example Selection in the Era of Million-Token Models',
+]
+
+def legacy_parse_date_string(date_str):
+    """parse_date_string() as it was before the format dispatcher and memo"""
+    if not date_str:
+        return None
+
+    date_str = str(date_str).strip()
+
+    try:
+        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+    except:
+        pass
+
+    date_formats = [
+        '%Y-%m-%d',
+        '%Y-%m-%d %H:%M:%S',
+        '%Y-%m-%dT%H:%M:%S',
+        '%Y-%m-%dT%H:%M:%SZ',
+        '%B %d, %Y',
+        '%b %d, %Y',
+        '%d %B %Y',
+        '%d %b %Y',
+        '%m/%d/%Y',
+        '%d/%m/%Y',
+    ]
+
+    for fmt in date_formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except:
+            continue
+
+    return None
+
+def legacy_extract_date_from_element(element, url=None):
+    """extract_date_from_element() as it was, recompiling its patterns on every call"""
+    pub_date = None
+
+    date_elem = element.find(['time', 'span', 'div', 'p'], class_=re.compile(r'date|time|published|timestamp|meta', re.I))
+    if date_elem:
+        date_str = date_elem.get('datetime') or date_elem.get('title') or date_elem.get_text(strip=True)
+        if date_str:
+            pub_date = legacy_parse_date_string(date_str)
+
+    if not pub_date:
+        parent = element.parent if hasattr(element, 'parent') else None
+        if parent:
+            date_elem = parent.find(['time', 'span', 'div'], class_=re.compile(r'date|time|published', re.I))
+            if date_elem:
+                date_str = date_elem.get('datetime') or date_elem.get_text(strip=True)
+                if date_str:
+                    pub_date = legacy_parse_date_string(date_str)
+
+    if not pub_date and url:
+        url_date_match = re.search(r'/(\d{4})/(\d{1,2})/', url)
+        if url_date_match:
+            year, month = url_date_match.groups()
+            try:
+                pub_date = datetime(int(year), int(month), 1, tzinfo=timezone.utc)
+            except:
+                pass
+
+    if not pub_date:
+        element_text = element.get_text()
+        date_patterns = [
+            r'(\d{4})-(\d{1,2})-(\d{1,2})',
+            r'(\w+)\s+(\d{1,2}),\s+(\d{4})',
+            r'(\d{1,2})/(\d{1,2})/(\d{4})',
+        ]
+        for pattern in date_patterns:
+            match = re.search(pattern, element_text)
+            if match:
+                try:
+                    if '-' in match.group(0):
+                        year, month, day = match.groups()
+                        pub_date = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+                    elif '/' in match.group(0):
+                        month, day, year = match.groups()
+                        pub_date = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+                    else:
+                        month_names = {
+                            'january': 1, 'february': 2, 'march': 3, 'april': 4,
+                            'may': 5, 'june': 6, 'july': 7, 'august': 8,
+                            'september': 9, 'october': 10, 'november': 11, 'december': 12
+                        }
+                        month_str, day, year = match.groups()
+                        month = month_names.get(month_str.lower(), 1)
+                        pub_date = datetime(int(year), month, int(day), tzinfo=timezone.utc)
+                    break
+                except:
+                    continue
+
+    if pub_date and pub_date.tzinfo is None:
+        pub_date = pub_date.replace(tzinfo=timezone.utc)
+
+    return pub_date
+
+def legacy_clean_title(title):
+    """The title-cleaning chain the DeepMind generators ran inline for every entry"""
+    title = re.sub(r'^\d{1,2}\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}\s*', '', title, flags=re.I)
+    title = re.sub(r'^\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+\d{4}\s*', '', title, flags=re.I)
+    title = re.sub(r'\s*\d{4}-\d{2}-\d{2}\s*$', '', title)
+    title = re.sub(r'\s*\d{1,2}/\d{1,2}/\d{4}\s*$', '', title)
+    title = re.sub(r'\s*\(\d{4}\)\s*$', '', title)
+    title = re.sub(r'\s*-\s*\d{4}\s*$', '', title)
+    title = re.sub(r'\s+', ' ', title).strip()
+    return title.strip(' -–—')
+
+def per_call_us(func, samples, number):
+    """Average cost of one call in microseconds"""
+    total = timeit.timeit(lambda: [func(sample) for sample in samples], number=number)
+    return total / (number * len(samples)) * 1e6
+
+def parse_cold(date_str):
+    date_utils._parse_date.cache_clear()
+    return date_utils.parse_date_string(date_str)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=2000, help="iterations over the sample set")
+    parser.add_argument('--json', help="write results to this JSON file")
+    args = parser.parse_args()
+
+    for sample in DATE_SAMPLES:
+        assert legacy_parse_date_string(sample) == date_utils.parse_date_string(sample), sample
+    for sample in TITLE_SAMPLES:
+        assert legacy_clean_title(sample) == date_utils.clean_title(sample), sample
+
+    soup = make_soup((FIXTURES_DIR / 'deepmind_publications.html').read_bytes())
+    elements = soup.find_all('li', class_='publication-item')
+    for element in elements:
+        assert legacy_extract_date_from_element(element) == date_utils.extract_date_from_element(element)
+    element_number = max(1, args.number // 20)
+
+    results = {
+        'parse_date_string': {
+            'before': per_call_us(legacy_parse_date_string, DATE_SAMPLES, args.number),
+            'after_uncached': per_call_us(parse_cold, DATE_SAMPLES, args.number),
+            'after': per_call_us(date_utils.parse_date_string, DATE_SAMPLES, args.number),
+        },
+        'extract_date_from_element': {
+            'before': per_call_us(legacy_extract_date_from_element, elements, element_number),
+            'after': per_call_us(date_utils.extract_date_from_element, elements, element_number),
+        },
+        'clean_title': {
+            'before': per_call_us(legacy_clean_title, TITLE_SAMPLES, args.number),
+            'after': per_call_us(date_utils.clean_title, TITLE_SAMPLES, args.number),
+        },
+    }
+
+    print(f"{'function':<28}{'variant':<16}{'µs/call':>10}")
+    for name, variants in results.items():
+        for variant, cost in variants.items():
+            print(f"{name:<28}{variant:<16}{cost:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark writing large feeds with feedgen against the streaming serializer
+
+Each writer and size runs in a fresh interpreter, so the peak resident memory it reports is its own.
+Memory is the growth of the peak RSS over the entries already in memory (lxml allocates outside
+the Python heap, so tracemalloc alone would undercount feedgen); the Python heap peak is shown too.
+
+Usage: python -m benchmarks.bench_feed_writer [--sizes 500,5000,50000] [--iterations N] [--json PATH]
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from feed_generators.feed_writer import build_feed, iter_rss, stream_feed
+from feed_generators.items import FeedItem
+
+WRITERS = ('feedgen', 'streaming')
+
+CHANNEL = {
+    'title': 'arXiv cs.AI',
+    'link': 'https://arxiv.org/list/cs.AI/recent',
+    'description': 'Latest papers in Artificial Intelligence from arXiv',
+    'language': 'en',
+}
+
+def synthetic_entries(count):
+    """arXiv-like entries: short title, abstract-sized description, GUID and date"""
+    now = datetime(2026, 4, 27, tzinfo=timezone.utc)
+    abstract = "We study large language models & <agents> under distribution shift. " * 12
+    return [FeedItem(
+        f"https://arxiv.org/abs/2604.{index:05d}",
+        title=f"Paper {index}: On the scaling of agents",
+        summary=f"Authors: A. Author, B. Author\n\n{abstract}",
+        published=now - timedelta(minutes=index),
+        guid=f"oai:arXiv.org:2604.{index:05d}",
+    ) for index in range(count)]
+
+def write_feedgen(path, entries):
+    path.write_bytes(build_feed(CHANNEL, entries).rss_str())
+
+def write_streaming(path, entries):
+    stream_feed(path, iter_rss(CHANNEL, reversed(entries))).replace(path)
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def run_child(writer, size, iterations):
+    """Time one writer in this process and print its measurements as JSON"""
+    write = write_feedgen if writer == 'feedgen' else write_streaming
+    entries = synthetic_entries(size)
+    rss_before = peak_rss_kb()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / 'feed.xml'
+        times = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            write(path, entries)
+            times.append(time.perf_counter() - start)
+        rss_growth = peak_rss_kb() - rss_before
+
+        tracemalloc.start()
+        write(path, entries)
+        heap_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        file_size = path.stat().st_size
+
+    print(json.dumps({
+        'median_ms': statistics.median(times) * 1000,
+        'min_ms': min(times) * 1000,
+        'rss_growth_kb': rss_growth,
+        'heap_peak_kb': heap_peak / 1024,
+        'file_kb': file_size / 1024,
+    }))
+
+def bench(writer, size, iterations):
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_feed_writer', '--child', writer, str(size), '--iterations', str(iterations)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='500,5000,50000', help="entries per feed, comma-separated")
+    parser.add_argument('--iterations', type=int, default=3, help="timed writes per benchmark (default: 3)")
+    parser.add_argument('--json', help="write results to this JSON file")
+    parser.add_argument('--child', nargs=2, metavar=('WRITER', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.iterations)
+        return
+
+    results = {}
+    print(f"{'entries':>8}{'writer':>11}{'median ms':>11}{'peak RSS +MB':>14}{'heap MB':>9}{'file MB':>9}")
+    for size in [int(size) for size in args.sizes.split(',') if size]:
+        for writer in WRITERS:
+            result = results[f'{writer}[{size}]'] = bench(writer, size, args.iterations)
+            print(f"{size:>8}{writer:>11}{result['median_ms']:>11.1f}{result['rss_growth_kb'] / 1024:>14.1f}"
+                  f"{result['heap_peak_kb'] / 1024:>9.1f}{result['file_kb'] / 1024:>9.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'iterations': args.iterations, 'results': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
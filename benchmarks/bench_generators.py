@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark every generator offline against the recorded fixtures, timing each stage of generate_feed()
+
+Stages are the ones recorded by feed_generators.metrics (fetch, parse, extract, dates, write)
+plus other, the time spent outside all of them. arXiv is additionally run on synthetic
+listings of the given sizes.
+
+Usage: python -m benchmarks.bench_generators [--iterations N] [--sizes 500,2000,10000] [--json PATH] [--baseline PATH]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks import replay
+from feed_generators import html_utils, metrics, registry
+
+# Stages as recorded by feed_generators.metrics, plus time spent outside all of them
+STAGES = metrics.STAGES + ('other',)
+
+def count_entries(feed_path):
+    with open(feed_path, 'rb') as f:
+        return f.read().count(b'<item>')
+
+def run_once(name, adapter):
+    """Run a generator once in a scratch directory and return its stage timings"""
+    generate_feed = registry.get_feed(name).load()
+    requests_before, bytes_before = adapter.request_count, adapter.bytes_served
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            with metrics.collect(name) as run, redirect_stdout(StringIO()):
+                generate_feed()
+            entries = count_entries(registry.get_feed(name).output)
+        finally:
+            os.chdir(cwd)
+
+    stages = dict(run.stages, other=run.duration - sum(run.stages.values()))
+    return {
+        'total': run.duration,
+        'stages': stages,
+        'entries': entries,
+        'requests': adapter.request_count - requests_before,
+        'bytes': adapter.bytes_served - bytes_before,
+    }
+
+def summarize(runs):
+    """Median and minimum of each stage over the runs, in milliseconds"""
+    def stats(values):
+        return {'median_ms': statistics.median(values) * 1000, 'min_ms': min(values) * 1000}
+
+    last = runs[-1]
+    return {
+        'iterations': len(runs),
+        'entries': last['entries'],
+        'requests': last['requests'],
+        'bytes': last['bytes'],
+        'total': stats([run['total'] for run in runs]),
+        'stages': {stage: stats([run['stages'][stage] for run in runs]) for stage in STAGES},
+    }
+
+def bench(name, iterations, routes=None):
+    adapter = replay.install(replay.ReplayAdapter(routes))
+    run_once(name, adapter)  # warm-up: imports, regex and parser caches
+    return summarize([run_once(name, adapter) for _ in range(iterations)])
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+    baseline = baseline or {}
+    print(f"{'benchmark':<30}{'entries':>8}{'total ms':>10}" + ''.join(f"{stage:>10}" for stage in STAGES) + (f"{'vs base':>10}" if baseline else ''))
+    for key, result in results.items():
+        row = f"{key:<30}{result['entries']:>8}{result['total']['median_ms']:>10.1f}"
+        row += ''.join(f"{result['stages'][stage]['median_ms']:>10.1f}" for stage in STAGES)
+        if key in baseline:
+            row += f"{result['total']['median_ms'] / baseline[key]['total']['median_ms']:>9.2f}x"
+        print(row)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=5, help="timed runs per benchmark (default: 5)")
+    parser.add_argument('--sizes', default='500,2000,10000', help="entries in the synthetic arXiv listings, comma-separated")
+    parser.add_argument('--only', help="run only this generator")
+    parser.add_argument('--json', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare total times against")
+    args = parser.parse_args()
+
+    os.environ['FEED_HTTP_CACHE'] = '0'
+    os.environ['FEED_INCREMENTAL'] = '0'
+    os.environ['DEEPMIND_FETCH_RATE'] = '0'  # the per-host politeness delay would dominate replayed fetches
+    os.environ['DEEPMIND_FETCH_WORKERS'] = '1'  # fetch time is summed over threads; replayed fetches gain nothing from them
+
+    names = [args.only] if args.only else replay.GENERATORS
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+
+    results = {}
+    for name in names:
+        results[name] = bench(name, args.iterations)
+        if name == 'arxiv_cs_ai':
+            for size in sizes:
+                listing = replay.synthetic_arxiv_listing(size)
+                routes = [(replay.ARXIV_LISTING_URL_RE, listing)] + replay.load_routes()
+                results[f'{name}[{size}]'] = bench(name, args.iterations, routes)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    if args.json:
+        report = {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'parser': html_utils.get_parser(),
+            'iterations': args.iterations,
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
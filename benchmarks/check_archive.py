@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Check the entry archive: upserts, the FTS5 index, search filters and saved-search feeds
+
+Entries are synthetic arXiv papers, then the arXiv generator's output for the recorded listing;
+the archive is a temporary database.
+
+Usage: python -m benchmarks.check_archive [--entries 5000]
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+from contextlib import closing, redirect_stdout
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+from benchmarks import replay
+from benchmarks.checks import environ, report, setup, workdir
+from feed_generators import archive, registry
+from feed_generators.feed_writer import load_entries, page_path
+from feed_generators.items import FeedItem
+from feed_generators.registry import SavedSearch
+
+WORDS = ('agents', 'alignment', 'benchmark', 'causal', 'diffusion', 'graph', 'language', 'memory', 'planning',
+         'policy', 'retrieval', 'reward', 'safety', 'sparse', 'transformer', 'vision')
+CATEGORIES = ('Artificial Intelligence (cs.AI)', 'Machine Learning (cs.LG)', 'Computation and Language (cs.CL)')
+
+def paper(number, now, rng):
+    url = f'https://arxiv.org/abs/2604.{number:05d}'
+    title = ' '.join(rng.sample(WORDS, 4)).capitalize()
+    if number % 10 == 0:
+        title += ' with reinforcement learning'
+    return FeedItem(url, title, ' '.join(rng.choices(WORDS, k=40)), now - timedelta(hours=number), guid=url,
+                    authors=[f'Author {number % 7}', f'Author {number % 11}'],
+                    categories=rng.sample(CATEGORIES, rng.randint(1, 2)), source='arxiv_cs_ai')
+
+def check_generator(directory):
+    """Archive what the arXiv generator extracts from the recorded listing and run the registered saved search on it"""
+    from feed_generators import arxiv_cs_ai
+
+    setup()
+    replay.install()
+    failures = []
+    path = directory / 'generated.sqlite'
+    archive_path, archive.ARCHIVE_PATH = archive.ARCHIVE_PATH, str(path)
+    try:
+        with redirect_stdout(StringIO()):
+            entries = arxiv_cs_ai.HTML_SOURCE.generate()
+        archived = archive.search(limit=0, path=path)
+        if not archived or archived[0].source != 'arxiv_cs_ai' or not all(entry.categories and entry.authors for entry in archived):
+            failures.append("generated arXiv entries are archived without their categories or authors")
+        if len(archive.search(category='cs.AI', limit=0, path=path)) != len(entries):
+            failures.append("category filter does not find the generated arXiv entries")
+
+        # The registered filters, with a query the recorded titles match and no window, which they are older than
+        saved = registry.select_searches(['arxiv_reinforcement_learning'])[0]
+        saved = SavedSearch(saved.name, 'reinforcement', 'feed_search.xml', saved.title, saved.link,
+                            source=saved.source, category=saved.category, max_entries=saved.max_entries)
+        with redirect_stdout(StringIO()):
+            found = archive.write_search_feed(saved, path)
+        expected = [entry.url for entry in entries if 'reinforcement' in entry.title.lower()]
+        print(f"recorded arXiv listing: {len(archived)} entries archived, saved search finds {len(found)}")
+        if not expected or sorted(entry.url for entry in found) != sorted(expected):
+            failures.append(f"saved search found {len(found)} generated entries, expected {len(expected)}")
+    finally:
+        archive.ARCHIVE_PATH = archive_path
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=5000, help="papers archived for the timings")
+    args = parser.parse_args()
+
+    failures = []
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    entries = [paper(number, now, rng) for number in range(1, args.entries + 1)]
+
+    with workdir() as directory:
+        path = directory / 'archive.sqlite'
+
+        start = time.perf_counter()
+        written = archive.archive_entries(entries, path)
+        insert_time = time.perf_counter() - start
+        start = time.perf_counter()
+        unchanged = archive.archive_entries(entries, path)
+        unchanged_time = time.perf_counter() - start
+        if written != len(entries) or unchanged:
+            failures.append(f"upserts wrote {written} then {unchanged} rows, expected {len(entries)} then 0")
+
+        changed = FeedItem(entries[0].url, 'Retitled paper', entries[0].summary, entries[0].published, entries[0].guid,
+                           entries[0].authors, entries[0].categories, entries[0].source)
+        if archive.archive_entries([changed], path) != 1:
+            failures.append("a changed entry was not updated")
+        # The same paper seen by another feed is archived again, but returned once
+        archive.archive_entries([FeedItem(changed.url, changed.title, guid=changed.guid, source='other')], path)
+
+        with closing(sqlite3.connect(path)) as connection:
+            try:
+                connection.execute("INSERT INTO entries_fts (entries_fts) VALUES ('integrity-check')")
+            except sqlite3.DatabaseError as e:
+                failures.append(f"FTS index out of sync with the entries: {e}")
+
+        found = archive.search('retitled', path=path)
+        if found != [changed]:
+            failures.append("an updated entry is not found by its new title exactly once")
+        if archive.search('"Retitled paper"', source='other', path=path)[0].source != 'other':
+            failures.append("source filter ignored")
+
+        start = time.perf_counter()
+        matches = archive.search('"reinforcement learning"', category='cs.AI', days=30, limit=0, path=path)
+        search_time = time.perf_counter() - start
+        expected = [entry for entry in entries[1:] if 'reinforcement learning' in entry.title
+                    and any('cs.AI' in category for category in entry.categories)
+                    and entry.published >= now - timedelta(days=30)]
+        if matches != expected:
+            failures.append(f"saved-search query found {len(matches)} entries, expected {len(expected)}")
+        ranked = archive.search('policy', limit=0, order='rank', path=path)
+        if sorted(entry.url for entry in ranked) != sorted(entry.url for entry in archive.search('policy', limit=0, path=path)):
+            failures.append("ordering by rank changes the matches")
+
+        saved = SavedSearch('check', '"reinforcement learning"', str(directory / 'feed_search.xml'),
+                            'Check', 'https://example.com/', category='cs.AI', days=30, max_entries=20)
+        with redirect_stdout(StringIO()):
+            archive.write_search_feed(saved, path)
+        written_feed = load_entries(saved.output)
+        if [entry.url for entry in written_feed] != [entry.url for entry in expected[:20]]:
+            failures.append("saved-search feed does not list the newest matches first")
+
+        # Paged, the latest page has the newest matches and the last page the oldest
+        with environ(FEED_PAGE_SIZE=6), redirect_stdout(StringIO()):
+            archive.write_search_feed(saved, path)
+        latest = [entry.url for entry in load_entries(page_path(saved.output, 1))]
+        last = [entry.url for entry in load_entries(page_path(saved.output, 4))]
+        if latest != [entry.url for entry in expected[:6]] or last != [entry.url for entry in expected[18:20]]:
+            failures.append("saved-search pages do not run from the newest matches to the oldest")
+
+        failures += check_generator(directory)
+
+    print(f"{len(entries)} entries: archived in {insert_time * 1000:.0f} ms, unchanged upsert {unchanged_time * 1000:.0f} ms, "
+          f"search {search_time * 1000:.1f} ms ({len(matches)} matches)")
+    report(failures, "archive upserts entries, keeps its index in sync and answers saved searches offline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Check the incremental arXiv export API ingestion against the recorded Atom response
+
+Usage: python -m benchmarks.check_arxiv_api
+"""
+
+
+from benchmarks import replay
+from benchmarks.checks import report, setup, workdir
+
+def main():
+    setup(ARXIV_API_DELAY=0)
+    adapter = replay.install()
+
+    from feed_generators import arxiv_api
+
+    failures = []
+    with workdir():
+        fixture = arxiv_api.parse_atom((replay.FIXTURES_DIR / 'arxiv_api_cs_ai.xml').read_bytes())
+
+        # First run: nothing stored, everything in the response is ingested
+        records = arxiv_api.update_records('cs.AI', max_records=500)
+        if [record['arxiv_id'] for record in records] != [record['arxiv_id'] for record in fixture]:
+            failures.append("first run did not ingest every fixture record in submission order")
+        if any(record['published'] is None or record['published'].tzinfo is None for record in records):
+            failures.append("records without an exact, timezone-aware submission timestamp")
+
+        # Incremental run: only the newest ten records are missing from the store
+        arxiv_api.save_records('cs.AI', fixture[10:])
+        new_records = arxiv_api.fetch_new_records('cs.AI', since=fixture[10]['published'])
+        if [record['arxiv_id'] for record in new_records] != [record['arxiv_id'] for record in fixture[:11]]:
+            failures.append(f"incremental run pulled {len(new_records)} records, expected the 10 newer ones plus the watermark")
+        merged = arxiv_api.update_records('cs.AI', max_records=500)
+        if len(merged) != len(fixture):
+            failures.append(f"merged store has {len(merged)} records, expected {len(fixture)}")
+
+    print(f"{adapter.request_count} API requests replayed")
+    report(failures, "arXiv API ingestion matches the recorded response")
+
+if __name__ == "__main__":
+    main()
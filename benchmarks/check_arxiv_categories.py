@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Check the multi-category arXiv fetch against synthetic listings that share some papers
+
+Each listing is served after a delay, so fetching them one after the other takes at least
+the sum of the delays; the concurrent fetch is timed against that.
+
+Usage: python -m benchmarks.check_arxiv_categories [--delay 0.2]
+"""
+
+import argparse
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks import replay
+from benchmarks.checks import report, setup, workdir
+
+# Category -> (count, show) of its synthetic listing, which has IDs 2604.{10000 + count - show} to 2604.{10000 + count - 1}.
+# The recorded papers are all in cs.AI and some are cross-listed in cs.LG and stat.ML, none in math.OC.
+LISTINGS = {
+    'cs.AI': (300, 300),
+    'cs.LG': (450, 200),  # shares 2604.10250-10299 with cs.AI
+    'stat.ML': (600, 100),  # shares nothing
+    'math.OC': (320, 100),  # shares 2604.10220-10299 with cs.AI and 10250-10319 with cs.LG
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--delay', type=float, default=0.2, help="seconds before each listing is served")
+    args = parser.parse_args()
+
+    setup(FEED_ARCHIVE=0, ARXIV_PAGE_RATE=0)
+
+    def serve_listing(url):
+        time.sleep(args.delay)
+        count, show = LISTINGS[urlsplit(url).path.split('/')[2]]
+        return replay.synthetic_arxiv_listing(count, 0, show)
+
+    adapter = replay.install(replay.ReplayAdapter([(replay.ARXIV_LISTING_URL_RE, serve_listing)]))
+
+    from feed_generators import arxiv_cs_ai, registry, server
+    from feed_generators.feed_writer import load_entries
+    from feed_generators.routing import subject_keys
+
+    parsed = []
+    listing_entry = arxiv_cs_ai.listing_entry
+
+    def counting_listing_entry(arxiv_url, arxiv_id, dd, heading=None):
+        parsed.append(arxiv_url)
+        return listing_entry(arxiv_url, arxiv_id, dd, heading)
+
+    arxiv_cs_ai.listing_entry = counting_listing_entry
+
+    categories = list(LISTINGS)
+    listed = {category: {f"2604.{10000 + count - 1 - i:05d}" for i in range(show)}
+              for category, (count, show) in LISTINGS.items()}
+    all_ids = set().union(*listed.values())
+    failures = []
+
+    start = time.perf_counter()
+    arxiv_cs_ai.fetch_category_papers(categories, max_workers=1)
+    sequential_time = time.perf_counter() - start
+    del parsed[:]
+
+    requests_before = adapter.request_count
+    start = time.perf_counter()
+    papers, memberships = arxiv_cs_ai.fetch_category_papers(categories)
+    concurrent_time = time.perf_counter() - start
+    requests = adapter.request_count - requests_before
+
+    print(f"{len(categories)} listings, {sum(len(ids) for ids in listed.values())} listed papers, {len(all_ids)} unique: "
+          f"{len(parsed)} parsed in {concurrent_time * 1000:.0f} ms, one listing at a time {sequential_time * 1000:.0f} ms")
+    if sorted(parsed) != sorted(set(parsed)) or set(papers) != all_ids:
+        failures.append(f"{len(parsed)} papers parsed, expected each of the {len(all_ids)} once")
+    if requests != len(categories):
+        failures.append(f"{requests} requests, expected one per category")
+    if concurrent_time > sequential_time - args.delay:
+        failures.append("listings were not fetched concurrently")
+    if any(memberships[arxiv_id] != [category for category in categories if arxiv_id in listed[category]]
+           for arxiv_id in all_ids):
+        failures.append("memberships do not list every listing that has the paper, in category order")
+
+    members = arxiv_cs_ai.merge_memberships(papers, memberships, categories)
+    for category in categories:
+        keyed = {arxiv_id for arxiv_id, entry in papers.items()
+                 if category.lower() in {key for subject in entry.categories for key in subject_keys(subject)}}
+        if not listed[category] <= members[category] or members[category] != keyed:
+            failures.append(f"{category} members are not the papers of its listing and the papers cross-listed in it")
+    if 'math.OC' not in papers['2604.10299'].categories or not members['math.OC'] <= listed['math.OC']:
+        failures.append("a category only known from its listing is not added to the papers")
+
+    with workdir():
+        with redirect_stdout(StringIO()):
+            arxiv_cs_ai.generate_category_feeds(categories)
+
+        combined = [arxiv_cs_ai.arxiv_id_from_url(entry.guid) for entry in load_entries(arxiv_cs_ai.ARXIV_COMBINED_OUTPUT)]
+        if sorted(combined) != sorted(all_ids):
+            failures.append("combined feed does not hold every paper once")
+        for category in categories:
+            expected = sorted(members[category], reverse=True)[:arxiv_cs_ai.FEED.max_entries]
+            written = [arxiv_cs_ai.arxiv_id_from_url(entry.guid) for entry in load_entries(arxiv_cs_ai.category_output(category))]
+            if sorted(written, reverse=True) != expected:
+                failures.append(f"{category} feed does not hold its newest {len(expected)} members")
+
+        # Only the registered routed category is split into the routes of the feed
+        routes = [route.output for route in registry.routes_for(arxiv_cs_ai.FEED.name)]
+        if arxiv_cs_ai.CATEGORY_FEEDS.routed_category not in categories or not any(Path(output).exists() for output in routes):
+            failures.append("the routes are not written from the routed category")
+
+        # The feed server serves the registered category feeds that were written
+        store = server.feed_store([arxiv_cs_ai.FEED])
+        written = [output for output in arxiv_cs_ai.CATEGORY_FEEDS.outputs() if Path(output).exists()]
+        if arxiv_cs_ai.ARXIV_COMBINED_OUTPUT not in written or any(store.get(f'/{output}') is None for output in written):
+            failures.append("the feed server does not serve the category feeds")
+
+    # A category run without the routed category writes no routes
+    with workdir():
+        with redirect_stdout(StringIO()):
+            arxiv_cs_ai.generate_category_feeds([category for category in categories if category != arxiv_cs_ai.CATEGORY_FEEDS.routed_category])
+        if any(Path(output).exists() for output in routes):
+            failures.append("routes are written from a category that is not the routed one")
+
+    report(failures, "category listings are fetched concurrently, each paper is parsed once and written to every feed it belongs to")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Check the paginated arXiv listing fetch against synthetic listings served page by page
+
+Usage: python -m benchmarks.check_arxiv_pages
+"""
+
+from contextlib import redirect_stdout
+from io import StringIO
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks import replay
+from benchmarks.checks import report, setup, workdir
+
+PAGE_SIZE = 100
+
+def main():
+    setup(ARXIV_PAGE_SIZE=PAGE_SIZE, ARXIV_PAGE_RATE=0)
+
+    listing = {'count': 0, 'shift': 0}
+
+    def serve_page(url):
+        query = parse_qs(urlsplit(url).query)
+        skip, show = int(query['skip'][0]), int(query['show'][0])
+        # A shift re-serves the end of the previous page, as when papers are listed between page fetches
+        skip = max(0, skip - listing['shift']) if skip else 0
+        return replay.synthetic_arxiv_listing(listing['count'], skip, show)
+
+    adapter = replay.install(replay.ReplayAdapter([(replay.ARXIV_LISTING_URL_RE, serve_page)]))
+
+    from feed_generators import arxiv_cs_ai
+    from feed_generators.feed_writer import load_entries
+
+    def run(count, shift=0):
+        listing.update(count=count, shift=shift)
+        requests_before = adapter.request_count
+        with redirect_stdout(StringIO()):
+            arxiv_cs_ai.generate_feed('pages')
+        ids = [arxiv_cs_ai.arxiv_id_from_url(entry.guid) for entry in load_entries(arxiv_cs_ai.FEED.output)]
+        return ids, adapter.request_count - requests_before
+
+    def expected_ids(count):
+        return {f"2604.{10000 + i:05d}" for i in range(count)}
+
+    failures = []
+    with workdir():
+        # First run: no previous feed, every page is fetched and overlapping pages are deduplicated
+        ids, requests = run(730, shift=5)
+        print(f"first run: {len(ids)} entries from {requests} page requests")
+        if len(ids) != len(set(ids)) or set(ids) != expected_ids(730):
+            failures.append(f"first run kept {len(set(ids))} unique of {len(ids)} entries, expected all 730 once")
+        if requests != 8:
+            failures.append(f"first run made {requests} page requests, expected 8")
+
+        # 50 new papers: they are all on the first page, which also reaches the previous run
+        ids, requests = run(780)
+        print(f"50 new papers: {len(ids)} entries from {requests} page requests")
+        if set(ids) != expected_ids(780):
+            failures.append("merged feed after 50 new papers does not hold every paper")
+        if requests != 1:
+            failures.append(f"50 new papers took {requests} page requests, expected 1")
+
+        # 320 new papers span four pages; later pages are cancelled once the old papers are reached
+        ids, requests = run(1100)
+        print(f"320 new papers: {len(ids)} entries from {requests} page requests")
+        if set(ids) != expected_ids(1100):
+            failures.append("merged feed after 320 new papers does not hold every paper")
+        if not 4 <= requests < 11:
+            failures.append(f"320 new papers took {requests} page requests, expected at least 4 and fewer than all 11")
+
+    report(failures, "paginated arXiv fetch stops at known papers and deduplicates across pages")
+
+if __name__ == "__main__":
+    main()
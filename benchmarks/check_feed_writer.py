@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Check that the streaming feed serializer writes byte for byte what feedgen writes
+
+Entries come from the committed feeds, from hand-written edge cases and from random text.
+Feeds written in all formats at once must read back to the same entries, also when followed
+page by page through their RFC 5005 links and from their compressed copies, and feed items must
+survive a JSON (and, if installed, msgpack) round trip.
+
+Usage: python -m benchmarks.check_feed_writer
+"""
+
+import gzip
+import json
+import xml.etree.ElementTree as ET
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.checks import environ, report
+from feed_generators import items
+from feed_generators.feed_writer import (ATOM_NS, FORMATS, brotli, build_feed, iter_atom, iter_json, iter_rss,
+                                         load_entries, load_feed_entries, output_paths, page_path, write_feed)
+from feed_generators.items import FeedItem
+
+ROOT = Path(__file__).resolve().parent.parent
+BUILD_DATE = datetime(2026, 4, 27, 16, 25, 39, 123456, tzinfo=timezone.utc)
+
+CHANNEL = {
+    'title': 'Check & <feed>',
+    'link': 'https://example.com/feed?a=1&b="2"',
+    'description': 'Line\r\nbreaks\tand "quotes"',
+    'language': 'en',
+}
+
+EDGE_CASES = [
+    FeedItem('https://example.com/1', 'Untitled'),
+    FeedItem('', '', 'Only a description', BUILD_DATE),
+    FeedItem('https://example.com/?q=a&r=b', ']]> & <b>bold</b>', 'é 😀 \x7f\x85',
+             datetime(999, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=5, minutes=30)))),
+    FeedItem('https://example.com/2', 'GUID', '\r\n\t"\'', datetime(2026, 2, 28, tzinfo=timezone(timedelta(hours=-8))),
+             guid='oai:arXiv.org:2604.00001'),
+]
+
+ALPHABET = 'abc XYZ 019 &<>"\'\t\n\r]]> é ß 中 😀 \x7f \x85  '
+
+def random_text(rng, length):
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+def random_entries(count, seed=0):
+    rng = random.Random(seed)
+    entries = []
+    for index in range(count):
+        entries.append(FeedItem(
+            f"https://example.com/{index}?{random_text(rng, 5)}",
+            title=random_text(rng, rng.randint(1, 40)),
+            summary=random_text(rng, rng.randint(0, 80)),
+            published=None if rng.random() < 0.2 else BUILD_DATE - timedelta(seconds=rng.randint(0, 10 ** 8)),
+            guid=f"guid-{index}" if rng.random() < 0.5 else None,
+        ))
+    return entries
+
+def feedgen_atom(channel, entries):
+    """feedgen's Atom output with the IDs and dates iter_atom() uses"""
+    fg = build_feed(channel, [])
+    fg.id(channel['link'])
+    fg.updated(BUILD_DATE)
+    for entry in entries:
+        fe = fg.add_entry(order='append')
+        fe.id(entry.key)
+        fe.title(entry.title)
+        fe.updated(entry.published or BUILD_DATE)
+        fe.link(href=entry.url, rel='alternate')
+        if entry.summary:
+            fe.description(entry.summary)
+        fe.pubDate(entry.published)
+    return fg.atom_str()
+
+def compare(name, channel, entries):
+    failures = []
+    fg = build_feed(channel, entries, order='append')
+    fg.lastBuildDate(BUILD_DATE)
+    if ''.join(iter_rss(channel, entries, BUILD_DATE)).encode('utf-8') != fg.rss_str():
+        failures.append(f"{name}: RSS differs from feedgen")
+    if all(entry.title for entry in entries):
+        if ''.join(iter_atom(channel, entries, BUILD_DATE)).encode('utf-8') != feedgen_atom(channel, entries):
+            failures.append(f"{name}: Atom differs from feedgen")
+    return failures
+
+def check_write_feed(entries):
+    """write_feed() output, reverse page order and the unchanged-file check"""
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / 'feed.xml'
+        if not write_feed(path, CHANNEL, entries, incremental=False):
+            failures.append("write_feed: first write skipped")
+        fg = build_feed(CHANNEL, entries)
+        fg.lastBuildDate(BUILD_DATE)
+        written = path.read_bytes()
+        expected = fg.rss_str()
+        start, end = written.index(b'<lastBuildDate>'), written.index(b'</lastBuildDate>')
+        if written[:start] + written[end:] != expected[:expected.index(b'<lastBuildDate>')] + expected[expected.index(b'</lastBuildDate>'):]:
+            failures.append("write_feed: file differs from feedgen")
+        if write_feed(path, CHANNEL, entries, incremental=False):
+            failures.append("write_feed: unchanged feed rewritten")
+        if not write_feed(path, CHANNEL, entries[:-1], incremental=False):
+            failures.append("write_feed: changed feed not rewritten")
+        if list(Path(workdir).glob('*.tmp')):
+            failures.append("write_feed: temporary file left behind")
+    return failures
+
+def check_formats(entries):
+    """One write_feed() call in every format: same files as one format at a time, same entries read back"""
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / 'feed.xml'
+        with environ(FEED_FORMATS=','.join(FORMATS)):
+            write_feed(path, CHANNEL, entries, incremental=True)
+            paths = output_paths(path)
+            for name, format_path in paths.items():
+                loaded = load_entries(format_path)
+                if loaded != entries:
+                    failures.append(f"{name}: entries read back differ from the ones written")
+
+            document = json.loads(paths['json'].read_text(encoding='utf-8'))
+            expected = json.loads(''.join(iter_json(CHANNEL, entries)))
+            if document != expected or document['version'] != 'https://jsonfeed.org/version/1.1':
+                failures.append("json: file is not the JSON Feed 1.1 document of the entries")
+            if len(document['items']) != len(entries):
+                failures.append(f"json: {len(document['items'])} items, expected {len(entries)}")
+            if any('content_text' not in item or 'id' not in item for item in document['items']):
+                failures.append("json: items without id or content_text")
+
+        # Only JSON selected: the other files are left alone and incremental runs read the JSON feed
+        with environ(FEED_FORMATS='json'):
+            stamps = {name: paths[name].stat().st_mtime_ns for name in ('rss', 'atom')}
+            write_feed(path, CHANNEL, entries[:5], incremental=True, max_entries=len(entries))
+            if {name: paths[name].stat().st_mtime_ns for name in ('rss', 'atom')} != stamps:
+                failures.append("formats that were not selected were rewritten")
+            if len(load_feed_entries(path)) != len(entries):
+                failures.append("incremental run did not merge with the entries of the JSON feed")
+    return failures
+
+def page_link(page_file, rel):
+    """Target of a paging link of a page file, or None"""
+    if page_file.suffix == '.json':
+        return json.loads(page_file.read_text(encoding='utf-8')).get('next_url') if rel == 'next' else None
+    root = ET.parse(page_file).getroot()
+    for link in root.iter(f'{ATOM_NS}link'):
+        if link.get('rel') == rel:
+            return link.get('href')
+    return None
+
+def check_pages(entries, page_size=7):
+    """Pages read back, following their next links, to the entries of the whole feed; compressed copies match"""
+    failures = []
+    compressions = ['gz', 'br'] if brotli is not None else ['gz']
+    settings = {'FEED_FORMATS': ','.join(FORMATS), 'FEED_PAGE_SIZE': str(page_size), 'FEED_COMPRESS': ','.join(compressions)}
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / 'feed.xml'
+        with environ(**settings):
+            write_feed(path, CHANNEL, entries, incremental=True)
+            count = -(-len(entries) // page_size)
+            for name, latest in output_paths(page_path(path, 1)).items():
+                page_file, paged, pages = latest, [], 0
+                while page_file is not None:
+                    paged += load_entries(page_file)
+                    pages += 1
+                    target = page_link(page_file, 'next')
+                    page_file = Path(workdir) / target if target else None
+                if paged != entries or pages != count:
+                    failures.append(f"{name}: {pages} pages with {len(paged)} entries, expected {count} with {len(entries)}")
+            last = output_paths(page_path(path, count))['atom']
+            if page_link(last, 'first') != 'feed_latest.atom' or page_link(last, 'previous') != f'feed_page{count - 1}.atom':
+                failures.append("atom: last page does not link to the first and previous pages")
+
+            files = [file for file in Path(workdir).iterdir() if file.suffix in ('.xml', '.atom', '.json')]
+            for file in files:
+                data = file.read_bytes()
+                if gzip.decompress(Path(f"{file}.gz").read_bytes()) != data:
+                    failures.append(f"{file.name}.gz is not the compressed feed")
+                if brotli is not None and brotli.decompress(Path(f"{file}.br").read_bytes()) != data:
+                    failures.append(f"{file.name}.br is not the compressed feed")
+
+            # In page order too, newest first: the latest page has the newest entries, the last page the oldest
+            write_feed(path, CHANNEL, entries, incremental=False)
+            latest = [entry.key for entry in load_entries(page_path(path, 1))]
+            oldest = [entry.key for entry in load_entries(page_path(path, count))]
+            if latest != [entry.key for entry in entries[:page_size]][::-1]:
+                failures.append("latest page does not hold the newest entries")
+            if oldest != [entry.key for entry in entries[(count - 1) * page_size:]][::-1]:
+                failures.append("last page does not hold the oldest entries")
+
+            # Fewer entries: the pages after the new last one are removed
+            write_feed(path, CHANNEL, entries[:page_size + 1], incremental=False)
+            left = sorted(file.name for file in Path(workdir).glob('feed_page*') if not file.name.startswith('feed_page2.'))
+            if left:
+                failures.append(f"stale pages left behind: {', '.join(left)}")
+    return failures
+
+def check_round_trip(entries):
+    failures = []
+    entries = entries + [FeedItem('https://arxiv.org/abs/2604.00001', 'Paper', 'Abstract', BUILD_DATE,
+                                  guid='https://arxiv.org/abs/2604.00001', authors=['A. Author', 'B. Author'],
+                                  categories=['Artificial Intelligence (cs.AI)'], source='arxiv_cs_ai')]
+    if items.loads_json(items.dumps_json(entries)) != entries:
+        failures.append("items: JSON round trip changed the items")
+    if items.msgpack is not None and items.loads_msgpack(items.dumps_msgpack(entries)) != entries:
+        failures.append("items: msgpack round trip changed the items")
+    return failures
+
+def main():
+    failures = []
+    checked = 0
+    for path in sorted(ROOT.glob('feed_*.xml')):
+        entries = load_entries(path)
+        failures += compare(path.name, dict(CHANNEL, title=path.stem), entries)
+        checked += len(entries)
+    failures += compare('edge cases', CHANNEL, EDGE_CASES)
+    failures += check_round_trip(EDGE_CASES + random_entries(50))
+    failures += compare('no language', dict(CHANNEL, language=None), EDGE_CASES)
+    for seed in range(20):
+        failures += compare(f"random seed {seed}", CHANNEL, random_entries(50, seed))
+    checked += len(EDGE_CASES) * 2 + 20 * 50
+    with redirect_stdout(StringIO()):
+        failures += check_write_feed(random_entries(200))
+        # Incremental feeds are written newest first; RSS dates have whole seconds
+        dated = [entry for entry in random_entries(100, seed=1) if entry.published]
+        for entry in dated:
+            entry.published = entry.published.replace(microsecond=0)
+        failures += check_formats(sorted(dated, key=lambda entry: entry.published, reverse=True))
+        failures += check_pages(sorted(dated, key=lambda entry: entry.published, reverse=True))
+
+    for invalid in ('null \x00 byte', 'vertical \x0b tab'):
+        try:
+            ''.join(iter_rss(CHANNEL, [FeedItem('https://example.com/', invalid)]))
+            failures.append(f"{invalid!r} accepted, feedgen rejects it")
+        except ValueError:
+            pass
+
+    print(f"{checked} entries serialized")
+    report(failures, "streaming serializer matches feedgen, all formats and their pages read back the same entries")
+    if items.msgpack is None:
+        print("msgpack is not installed, its round trip was not checked")
+
+if __name__ == "__main__":
+    main()
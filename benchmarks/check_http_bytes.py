@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Check that the downloaded bytes metric counts response bodies as they come over the wire
+
+A local server sends the same gzip-compressed page with a Content-Length and chunked, and
+plain; fetch() must return the decoded page and count the compressed size where it is known.
+
+Usage: python -m benchmarks.check_http_bytes
+"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.checks import report, setup
+
+BODY = b"<html><body>" + b"<p>paper</p>" * 10000 + b"</body></html>"
+COMPRESSED = gzip.compress(BODY)
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = BODY if self.path == '/plain' else COMPRESSED
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        if self.path != '/plain':
+            self.send_header('Content-Encoding', 'gzip')
+        if self.path == '/chunked':
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(body), body))
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    setup()
+
+    from feed_generators import http_utils, metrics
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Chunked bodies are not counted by urllib3, so they count their decoded size
+    expected = {'/gzip': len(COMPRESSED), '/chunked': len(BODY), '/plain': len(BODY)}
+    failures = []
+    try:
+        for path, size in expected.items():
+            with metrics.collect(path) as run:
+                content = http_utils.fetch(f"http://127.0.0.1:{server.server_port}{path}")
+            print(f"{path:<10} {len(content):>7} bytes decoded, {run.counters['bytes']:>7} counted")
+            if content != BODY:
+                failures.append(f"{path} did not return the decoded page")
+            if run.counters['bytes'] != size:
+                failures.append(f"{path} counted {run.counters['bytes']} bytes, expected {size}")
+    finally:
+        server.shutdown()
+
+    report(failures, "the bytes metric counts compressed responses at their size on the wire")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Check that every HTML parser backend extracts the same feed entries from the recorded fixtures,
+and that the arXiv generator falls back to bare links on a page without the listing markup
+
+Usage: python -m benchmarks.check_parsers
+"""
+
+import importlib
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks import replay
+from benchmarks.checks import report, setup, workdir
+from feed_generators import html_utils
+
+def read_entries(feed_path):
+    """Return comparable (title, link, guid, description, day) tuples from an RSS file"""
+    entries = []
+    for item in ET.parse(feed_path).getroot().iter('item'):
+        pub_date = item.findtext('pubDate') or ''
+        entries.append((
+            item.findtext('title'),
+            item.findtext('link'),
+            item.findtext('guid'),
+            item.findtext('description'),
+            pub_date[:16],  # fallback dates are relative to now, compare the day only
+        ))
+    return entries
+
+def run_generator(name, parser):
+    """Run a generator against the fixtures in a scratch directory and return its entries"""
+    html_utils.set_parser(parser)
+    module = importlib.import_module(f'feed_generators.{name}')
+    with workdir():
+        with redirect_stdout(StringIO()):
+            module.generate_feed()
+        return read_entries(f'feed_{name}.xml')
+
+def check_link_fallback(parsers):
+    """Run the arXiv generator on a page whose papers are not in a <dl> listing"""
+    page = (replay.FIXTURES_DIR / 'arxiv_cs_ai_no_listing.html').read_bytes()
+    replay.install(replay.ReplayAdapter([(replay.ARXIV_LISTING_URL_RE, page)]))
+    failures = []
+    try:
+        for parser in parsers:
+            titles = [entry[0] for entry in run_generator('arxiv_cs_ai', parser)]
+            if sorted(titles) == ['Paper A', 'Paper B']:
+                print(f"{'arxiv_cs_ai (links)':<24} {parser:<12} {len(titles)} entries")
+                continue
+            failures.append(f"{'arxiv_cs_ai (links)':<24} {parser:<12} found {titles}, expected the two linked papers")
+    finally:
+        replay.install()
+    return failures
+
+def main():
+    setup()
+    replay.install()
+    parsers = html_utils.available_parsers()
+    print(f"Parsers: {', '.join(parsers)}")
+
+    failures = []
+    for name in replay.GENERATORS:
+        results = {parser: run_generator(name, parser) for parser in parsers}
+        reference_parser = parsers[-1]
+        reference = results[reference_parser]
+        for parser, entries in results.items():
+            print(f"{name:<24} {parser:<12} {len(entries)} entries")
+            if entries == reference:
+                continue
+            failures.append(f"{name:<24} {parser:<12} {len(entries)} entries, differs from {reference_parser} ({len(reference)} entries)")
+            for ours, theirs in zip(entries, reference):
+                if ours != theirs:
+                    print(f"    {parser}: {ours}\n    {reference_parser}: {theirs}")
+                    break
+    failures += check_link_fallback(parsers)
+    html_utils.set_parser(None)
+
+    report(failures, "every parser backend extracts the same entries and bare links are found without a listing")
+
+if __name__ == "__main__":
+    main()
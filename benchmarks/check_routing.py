@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Check the router against one regex per route and time both as the number of routes grows
+
+Entries are synthetic arXiv papers with cross-listed subjects; routes are random subject and
+keyword rules. The router must give the same sub-feeds as the regexes, at a cost that stays
+about flat in the number of routes. The arXiv generator is also run on the recorded listing,
+whose subject routes must get the papers cross-listed in their subjects.
+
+Usage: python -m benchmarks.check_routing [--entries 500] [--routes 10,100,1000]
+"""
+
+import argparse
+import random
+import re
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from pathlib import Path
+
+from benchmarks import replay
+from benchmarks.checks import report, setup, workdir
+from feed_generators.items import FeedItem
+from feed_generators.registry import Route
+from feed_generators.routing import Router, router_for, subject_keys, write_routes
+
+WORDS = [f"{prefix}{suffix}" for prefix in ('neur', 'graph', 'agent', 'plan', 'reward', 'vision', 'token', 'causal',
+                                            'sparse', 'memor', 'robot', 'proof', 'safe', 'align', 'search', 'diffus')
+         for suffix in ('al', 'ing', 'er', 'ic', 'ive', 'ity', 'ed', 'ation', 'ness', 'ist')]
+SUBJECTS = ['Artificial Intelligence (cs.AI)', 'Machine Learning (cs.LG)', 'Computation and Language (cs.CL)',
+            'Computer Vision and Pattern Recognition (cs.CV)', 'Robotics (cs.RO)', 'Multiagent Systems (cs.MA)',
+            'Logic in Computer Science (cs.LO)', 'Information Retrieval (cs.IR)']
+
+def random_entries(count, rng):
+    now = datetime.now(timezone.utc)
+    entries = []
+    for number in range(count):
+        title = ' '.join(rng.choices(WORDS, k=8)).capitalize()
+        summary = ' '.join(rng.choices(WORDS, k=150)) + '. Multi-agent, tool-use and end-to-end.'
+        entries.append(FeedItem(f'https://arxiv.org/abs/2604.{number:05d}', title, summary,
+                                now - timedelta(hours=number), categories=rng.sample(SUBJECTS, rng.randint(1, 3))))
+    return entries
+
+def random_routes(count, rng):
+    routes = []
+    for number in range(count):
+        keywords = [' '.join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(rng.randint(1, 4))]
+        subjects = [rng.choice(SUBJECTS).split('(')[1].rstrip(')')] if number % 5 == 0 else []
+        routes.append(Route(f'route{number}', 'arxiv_cs_ai', f'feed_route{number}.xml', f'Route {number}',
+                            subjects=subjects, keywords=keywords))
+    routes.append(Route('multi_agent', 'arxiv_cs_ai', 'feed_multi_agent.xml', 'Multi-agent',
+                        keywords=['multi agent', 'tool use']))
+    return routes
+
+def regex_route(routes, entries):
+    """The obvious way: one keyword regex and one subject check per route, for every entry"""
+    patterns = []
+    for route in routes:
+        phrases = [r'\W+'.join(re.escape(word) for word in re.findall(r'\w+', keyword.lower())) for keyword in route.keywords]
+        pattern = re.compile(r'(?<!\w)(?:' + '|'.join(phrases) + r')(?!\w)') if phrases else None
+        patterns.append((route, pattern, {subject.lower() for subject in route.subjects}))
+
+    routed = {route: [] for route in routes}
+    for entry in entries:
+        text = f"{entry.title}\n{entry.summary}".lower()
+        keys = {key for category in entry.categories for key in subject_keys(category)}
+        for route, pattern, subjects in patterns:
+            if subjects & keys or (pattern and pattern.search(text)):
+                routed[route].append(entry)
+    return routed
+
+def check_fixture():
+    """Run the arXiv generator on the recorded listing and compare its subject routes with the papers' subjects"""
+    from feed_generators import arxiv_cs_ai, registry
+    from feed_generators.feed_writer import load_entries
+
+    setup(FEED_ARCHIVE=0)
+    replay.install()
+    content = (replay.FIXTURES_DIR / 'arxiv_cs_ai.html').read_bytes()
+    papers = list(arxiv_cs_ai.iter_entries(arxiv_cs_ai.parse_listing(content)))
+
+    failures = []
+    with workdir():
+        with redirect_stdout(StringIO()):
+            arxiv_cs_ai.generate_feed('html')
+        for route in registry.routes_for(arxiv_cs_ai.FEED.name):
+            if not route.subjects or route.keywords:
+                continue
+            subjects = {subject.lower() for subject in route.subjects}
+            expected = {paper.url for paper in papers
+                        if subjects & {key for category in paper.categories for key in subject_keys(category)}}
+            written = {entry.url for entry in load_entries(route.output)}
+            print(f"{route.name}: {len(written)} of {len(papers)} recorded papers")
+            if not expected or written != expected:
+                failures.append(f"{route.name} has {len(written)} papers, expected the {len(expected)} cross-listed in "
+                                f"{', '.join(route.subjects)}")
+
+    # Routes that match nothing are not written
+    with workdir():
+        unrouted = [paper for paper in papers if not router_for(arxiv_cs_ai.FEED.name).match(paper)]
+        with redirect_stdout(StringIO()):
+            write_routes(arxiv_cs_ai.FEED, arxiv_cs_ai.category_channel('cs.AI'), unrouted)
+        written = [route.output for route in registry.routes_for(arxiv_cs_ai.FEED.name) if Path(route.output).exists()]
+        if not unrouted or written:
+            failures.append(f"routes without entries are written: {', '.join(written) or '(no unrouted papers)'}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=500, help="synthetic papers to route")
+    parser.add_argument('--routes', default='10,100,1000', help="comma-separated numbers of routes")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    entries = random_entries(args.entries, rng)
+    failures = []
+
+    print(f"{'routes':>7}{'router ms':>12}{'regex ms':>12}{'routed':>10}")
+    for count in [int(value) for value in args.routes.split(',')]:
+        routes = random_routes(count, rng)
+
+        start = time.perf_counter()
+        router = Router(routes)
+        routed = router.route(entries)
+        router_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = regex_route(routes, entries)
+        regex_time = time.perf_counter() - start
+
+        if routed != expected:
+            differing = [route.name for route in routes if routed[route] != expected[route]]
+            failures.append(f"{count} routes: router and regexes disagree on {', '.join(differing[:5])}")
+        if not routed[routes[-1]]:
+            failures.append("hyphenated text does not match a keyword written with spaces")
+        total = sum(len(matched) for matched in routed.values())
+        print(f"{count:>7}{router_time * 1000:>12.1f}{regex_time * 1000:>12.1f}{total:>10}")
+
+    failures += check_fixture()
+    report(failures, "router matches the per-route regexes in one pass over the entries and routes the recorded listing by subject")
+
+if __name__ == "__main__":
+    main()
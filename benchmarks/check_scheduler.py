@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Check the daemon scheduler with short intervals: concurrency, per-feed intervals, jitter and backoff
+
+Usage: python -m benchmarks.check_scheduler
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.checks import report
+from feed_generators.registry import FeedDefinition
+from feed_generators.scheduler import Scheduler, next_delay
+
+def main():
+    failures = []
+
+    # Delays: the interval with jitter, or an exponential backoff capped at max_backoff
+    rng = random.Random(0)
+    delays = [next_delay(100, 0, jitter=0.1, rng=rng) for _ in range(1000)]
+    if not all(90 <= delay <= 110 for delay in delays) or max(delays) - min(delays) < 10:
+        failures.append("interval delays are not spread over +/-10%")
+    backoff = [next_delay(100, failures_in_row, jitter=0, retry_delay=5, max_backoff=30) for failures_in_row in range(1, 6)]
+    if backoff != [5, 10, 20, 30, 30]:
+        failures.append(f"backoff delays {backoff}, expected [5, 10, 20, 30, 30]")
+
+    # A fast feed, a slow feed and a feed that always fails, with two workers
+    feeds = [
+        FeedDefinition('fast', url='', output='', max_entries=0, interval=0.05),
+        FeedDefinition('slow', url='', output='', max_entries=0, interval=0.4),
+        FeedDefinition('broken', url='', output='', max_entries=0, interval=0.05),
+    ]
+    lock = threading.Lock()
+    active = defaultdict(int)
+    overlaps = []
+    starts = defaultdict(list)
+
+    def run(feed):
+        with lock:
+            active[feed.name] += 1
+            if active[feed.name] > 1:
+                overlaps.append(feed.name)
+            starts[feed.name].append(time.monotonic())
+        time.sleep(0.03 if feed.name != 'slow' else 0.1)
+        with lock:
+            active[feed.name] -= 1
+        return feed.name != 'broken'
+
+    scheduler = Scheduler(feeds, run, jobs=2, jitter=0.1, retry_delay=0.02, max_backoff=0.32)
+    stopper = threading.Timer(1.5, scheduler.stop)
+    stopper.start()
+    scheduler.run_forever()
+    stopper.cancel()
+
+    counts = {name: len(times) for name, times in starts.items()}
+    print(f"runs in 1.5s: {counts}")
+    if overlaps:
+        failures.append(f"feeds ran twice at once: {sorted(set(overlaps))}")
+    if not counts.get('fast', 0) > counts.get('slow', 0) >= 2:
+        failures.append("the fast feed did not run more often than the slow one")
+    gaps = [later - earlier for earlier, later in zip(starts['broken'], starts['broken'][1:])]
+    # Retries wait 0.02s, 0.04s, 0.08s, ... after a 0.03s run
+    if len(gaps) < 4 or gaps[3] < 2 * gaps[0]:
+        failures.append(f"retries of the failing feed do not back off: {[round(gap, 3) for gap in gaps]}")
+    # A run still in progress when the scheduler stops is finished but not counted
+    if scheduler.failures['broken'] not in (counts['broken'], counts['broken'] - 1) or scheduler.failures['fast']:
+        failures.append("failures in a row are not counted per feed")
+
+    report(failures, "scheduler runs feeds on their intervals, one run per feed at a time, backing off after failures")
+
+if __name__ == "__main__":
+    main()
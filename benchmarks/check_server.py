@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Check the feed server: encodings, conditional GET, HEAD, reloading a replaced feed and its compressed copies, and time polls
+
+Usage: python -m benchmarks.check_server [--polls 2000]
+"""
+
+import argparse
+import gzip
+import http.client
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.checks import report
+from feed_generators import server
+
+FEED = Path(__file__).parent.parent / 'feed_arxiv_cs_ai.xml'
+
+def request(connection, path, method='GET', **headers):
+    connection.request(method, path, headers={name.replace('_', '-'): value for name, value in headers.items()})
+    response = connection.getresponse()
+    return response, response.read()
+
+def time_polls(connection, polls, **headers):
+    start = time.perf_counter()
+    for _ in range(polls):
+        request(connection, '/feed.xml', **headers)
+    return (time.perf_counter() - start) / polls * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--polls', type=int, default=2000, help="polls timed per kind of request")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'feed.xml'
+        data = FEED.read_bytes()
+        path.write_bytes(data)
+
+        store = server.FeedStore({'/feed.xml': (path, server.CONTENT_TYPES['rss'])})
+        feed_server = server.start_server(store, ('127.0.0.1', 0))
+        connection = http.client.HTTPConnection(*feed_server.server_address[:2])
+        try:
+            response, body = request(connection, '/feed.xml')
+            etag, last_modified = response.getheader('ETag'), response.getheader('Last-Modified')
+            if response.status != 200 or body != data or response.getheader('Content-Encoding'):
+                failures.append("plain GET does not return the feed file")
+            if not etag or not last_modified or response.getheader('Vary') != 'Accept-Encoding':
+                failures.append("ETag, Last-Modified or Vary missing")
+
+            response, body = request(connection, '/feed.xml', Accept_Encoding='gzip, deflate')
+            if response.getheader('Content-Encoding') != 'gzip' or gzip.decompress(body) != data:
+                failures.append("gzip body does not decompress to the feed file")
+            if server.brotli is not None:
+                response, body = request(connection, '/feed.xml', Accept_Encoding='gzip, deflate, br')
+                if response.getheader('Content-Encoding') != 'br' or server.brotli.decompress(body) != data:
+                    failures.append("brotli body does not decompress to the feed file")
+            response, body = request(connection, '/feed.xml', Accept_Encoding='br;q=0, gzip;q=0')
+            if response.getheader('Content-Encoding') or body != data:
+                failures.append("encodings refused with q=0 are used")
+            print(f"{len(data)} bytes, gzip {len(store.get('/feed.xml').bodies['gzip'])}, "
+                  f"br {len(store.get('/feed.xml').bodies.get('br', b''))}")
+
+            response, body = request(connection, '/feed.xml', If_None_Match=etag)
+            if response.status != 304 or body:
+                failures.append(f"If-None-Match with the current ETag gives {response.status}")
+            response, _ = request(connection, '/feed.xml', If_None_Match=f'W/{etag[:-1]}-gzip"', Accept_Encoding='gzip')
+            if response.status != 304:
+                failures.append("the ETag of another encoding does not match")
+            response, _ = request(connection, '/feed.xml', If_Modified_Since=last_modified)
+            if response.status != 304:
+                failures.append("If-Modified-Since with the current date does not give 304")
+            response, _ = request(connection, '/feed.xml', If_None_Match='"stale"', If_Modified_Since=last_modified)
+            if response.status != 200:
+                failures.append("a stale ETag is not answered with the feed")
+
+            response, body = request(connection, '/feed.xml', method='HEAD')
+            if response.status != 200 or body or int(response.getheader('Content-Length')) != len(data):
+                failures.append("HEAD does not give the headers of GET without a body")
+            response, _ = request(connection, '/missing.xml')
+            if response.status != 404:
+                failures.append("an unknown path is not a 404")
+
+            # A generator writes the new version next to the feed and renames it over the old one
+            new_data = data.replace(b'<item>', b'<item><!-- new -->', 1)
+            tmp_path = path.with_name(path.name + '.tmp')
+            tmp_path.write_bytes(new_data)
+            os.replace(tmp_path, path)
+            # ... and then writes its compressed copy, which the server takes instead of compressing again
+            written_copy = gzip.compress(new_data, mtime=1)
+            path.with_name(path.name + '.gz').write_bytes(written_copy)
+            if store.reload() != ['/feed.xml'] or store.reload():
+                failures.append("a replaced feed is not reloaded exactly once")
+            if store.get('/feed.xml').bodies['gzip'] != written_copy:
+                failures.append("the compressed copy written with the feed is not used")
+            response, body = request(connection, '/feed.xml', If_None_Match=etag)
+            if response.status != 200 or body != new_data or response.getheader('ETag') == etag:
+                failures.append("the old ETag still matches after a reload")
+
+            etag = response.getheader('ETag')
+            for label, headers in [('304', {'If_None_Match': etag}), ('200 br', {'Accept_Encoding': 'gzip, br'}),
+                                   ('200 identity', {})]:
+                print(f"{label:<13} {time_polls(connection, args.polls, **headers):7.1f} us per poll")
+        finally:
+            connection.close()
+            feed_server.shutdown()
+            feed_server.server_close()
+
+    report(failures, "feeds are served from memory with pre-compressed bodies, 304s for current copies and atomic reloads")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Check that regenerating the feeds from unchanged pages leaves the files untouched
+
+Every generator runs three times against the recorded fixtures: the second run must skip the
+write on the entry fingerprint, and the third, after the cache with the first-seen dates and
+fingerprints is deleted, must still give byte-identical feeds, pages and compressed copies.
+
+Usage: python -m benchmarks.check_stable_output
+"""
+
+import shutil
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from benchmarks import replay
+from benchmarks.checks import report, setup, workdir
+
+def main():
+    setup(DEEPMIND_FETCH_RATE=0, FEED_FORMATS='rss,atom,json', FEED_PAGE_SIZE=10, FEED_COMPRESS='gz')
+    replay.install()
+
+    from feed_generators import registry
+    from feed_generators.http_cache import CACHE_DIR
+
+    def run(name):
+        """Run a generator and return the bytes and modification times of its files, and its output"""
+        feed = registry.get_feed(name)
+        log = StringIO()
+        with redirect_stdout(log):
+            feed.load()()
+        # Every format, page and compressed copy
+        paths = Path().glob(f"{Path(feed.output).stem}*")
+        return {path.name: (path.read_bytes(), path.stat().st_mtime_ns) for path in paths}, log.getvalue()
+
+    failures = []
+    with workdir():
+        for name in replay.GENERATORS:
+            first, _ = run(name)
+            second, log = run(name)
+            if second != first:
+                failures.append(f"{name}: second run changed the feed files")
+            if 'same fingerprint' not in log:
+                failures.append(f"{name}: second run did not skip the write on the fingerprint")
+
+            shutil.rmtree(Path(CACHE_DIR), ignore_errors=True)
+            third, _ = run(name)
+            if {file: content for file, (content, _) in third.items()} != {file: content for file, (content, _) in first.items()}:
+                failures.append(f"{name}: feed changed after the first-seen dates were lost")
+            print(f"{name:<24} {len(first)} files stable over 3 runs")
+
+    report(failures, "unchanged pages give unchanged feeds")
+
+if __name__ == "__main__":
+    main()
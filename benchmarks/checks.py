@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Shared harness of the check scripts, and a runner for all of them
+
+A check sets its environment with setup(), works in a scratch directory from workdir(), collects
+its failure messages in a list and ends with report(). The runner runs each check in its own
+process, since the checks configure the generators through the environment and module state,
+and fails if any of them does.
+
+Usage: python -m benchmarks.checks [check_parsers ...]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+
+def setup(**env):
+    """Turn the fetch cache off and set `env`; call before the generators are imported"""
+    os.environ['FEED_HTTP_CACHE'] = '0'
+    os.environ.update({name: str(value) for name, value in env.items()})
+
+@contextmanager
+def environ(**env):
+    """Set `env` for the duration of the block, then restore the previous values"""
+    previous = {name: os.environ.get(name) for name in env}
+    os.environ.update({name: str(value) for name, value in env.items()})
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+@contextmanager
+def workdir():
+    """Run the block in a temporary working directory, removed afterwards; yields its path"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as path:
+        os.chdir(path)
+        try:
+            yield Path(path)
+        finally:
+            os.chdir(cwd)
+
+def report(failures, success):
+    """Print the failures and exit with status 1, or print the success message"""
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"✓ {success}")
+
+def check_names():
+    return sorted(path.stem for path in BENCHMARKS_DIR.glob('check_*.py'))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('checks', nargs='*', metavar='check', help="checks to run (default: all)")
+    args = parser.parse_args()
+
+    unknown = sorted(set(args.checks) - set(check_names()))
+    if unknown:
+        parser.error(f"unknown check {unknown[0]!r}, expected some of: {', '.join(check_names())}")
+
+    names = args.checks or check_names()
+    failed = []
+    for name in names:
+        print(f"== {name}", flush=True)
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-m', f'benchmarks.{name}'], cwd=BENCHMARKS_DIR.parent)
+        if result.returncode:
+            failed.append(name)
+        print(f"== {name}: {'failed' if result.returncode else 'passed'} in {time.perf_counter() - start:.1f}s\n", flush=True)
+
+    if failed:
+        print(f"✗ {len(failed)} of {len(names)} checks failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("✓ all checks passed")
+
+if __name__ == "__main__":
+    main()
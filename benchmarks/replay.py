@@ -0,0 +1,96 @@
+"""
+Replay recorded HTML fixtures through the shared HTTP session instead of the network
+"""
+
+import json
+import re
+from pathlib import Path
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from feed_generators import http_utils
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+# Generators that have recorded fixtures
+GENERATORS = ('arxiv_cs_ai', 'deepmind_blog', 'deepmind_publications')
+
+ARXIV_LISTING_URL_RE = re.compile(r'^https://arxiv\.org/list/')
+ARXIV_ENTRY_RE = re.compile(r'<dt>.*?</dd>\n', re.S)
+ARXIV_ID_RE = re.compile(r'id="(\d{4}\.\d{4,5})"')
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter answering requests from fixture files matched by URL pattern.
+
+    Routes are (pattern, body) pairs, where body is bytes or a function of the URL returning
+    bytes; the first pattern that matches the URL wins and unmatched URLs get a 404.
+    """
+
+    def __init__(self, routes=None):
+        super().__init__()
+        self.routes = routes if routes is not None else load_routes()
+        self.request_count = 0
+        self.bytes_served = 0
+
+    def send(self, request, **kwargs):
+        self.request_count += 1
+        response = Response()
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict({'Content-Type': 'text/html; charset=utf-8'})
+        response.status_code = 404
+        response._content = b''
+        for pattern, body in self.routes:
+            if pattern.search(request.url):
+                if callable(body):
+                    body = body(request.url)
+                response.status_code = 200
+                response._content = body
+                self.bytes_served += len(body)
+                break
+        return response
+
+    def close(self):
+        pass
+
+def load_routes(fixtures_dir=FIXTURES_DIR):
+    """Load (pattern, body) routes from the fixtures manifest"""
+    fixtures_dir = Path(fixtures_dir)
+    manifest = json.loads((fixtures_dir / 'manifest.json').read_text(encoding='utf-8'))
+    return [(re.compile(route['url']), (fixtures_dir / route['file']).read_bytes()) for route in manifest]
+
+def synthetic_arxiv_listing(count, skip=0, show=None, fixtures_dir=FIXTURES_DIR):
+    """Build page [skip, skip + show) of an arXiv listing with `count` entries by repeating the recorded ones.
+
+    IDs count down from the newest entry, so a longer listing only adds entries at the top
+    and every other entry keeps its ID.
+    """
+    page = (Path(fixtures_dir) / 'arxiv_cs_ai.html').read_text(encoding='utf-8')
+    recorded = ARXIV_ENTRY_RE.findall(page)
+    head = page[:page.index(recorded[0])]
+    tail = page[page.index(recorded[-1]) + len(recorded[-1]):]
+
+    entries = []
+    for i in range(skip, min(count, skip + show) if show else count):
+        entry = recorded[i % len(recorded)]
+        old_id = ARXIV_ID_RE.search(entry).group(1)
+        new_id = f"{old_id[:4]}.{10000 + count - 1 - i:05d}"
+        entry = entry.replace(old_id, new_id)
+        entry = re.sub(r"name='item\d+'>\[\d+\]", f"name='item{i + 1}'>[{i + 1}]", entry)
+        entries.append(entry)
+
+    total = f'{count} of {count}'
+    head = head.replace(f'{len(recorded)} of {len(recorded)}', total).replace(f'Total of {len(recorded)}', f'Total of {count}')
+    tail = tail.replace(f'Total of {len(recorded)}', f'Total of {count}')
+    return (head + ''.join(entries) + tail).encode('utf-8')
+
+def install(adapter=None):
+    """Route the shared generator session through a replay adapter and return the adapter"""
+    adapter = adapter or ReplayAdapter()
+    session = http_utils.create_session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    http_utils._session = session
+    return adapter
@@ -0,0 +1,224 @@
+"""
+SQLite archive of every entry the generators have emitted, with an FTS5 full-text index
+
+Each run upserts its entries, so the archive keeps papers and posts after they drop off the
+source page. search() queries the index without network access, and saved searches (see
+registry.SEARCHES) are written as feeds of their own:
+
+    python -m feed_generators.archive search '"reinforcement learning"' --category cs.AI --days 30
+    python -m feed_generators.archive saved
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from feed_generators.http_cache import CACHE_DIR
+from feed_generators.items import FeedItem
+
+ARCHIVE = os.environ.get('FEED_ARCHIVE', '1') == '1'
+ARCHIVE_PATH = os.environ.get('FEED_ARCHIVE_PATH', str(Path(CACHE_DIR) / 'archive.sqlite'))
+
+# Authors and categories are stored one per line, which the FTS tokenizer treats as separators
+LIST_SEPARATOR = '\n'
+
+# The FTS table indexes the entries table (external content) and triggers keep the two in sync
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    guid TEXT,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    categories TEXT NOT NULL,
+    published TEXT,
+    published_at REAL,
+    archived_at REAL NOT NULL,
+    UNIQUE (source, key)
+);
+CREATE INDEX IF NOT EXISTS entries_published_at ON entries (published_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    title, authors, categories, summary,
+    content='entries', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, title, authors, categories, summary)
+    VALUES (new.id, new.title, new.authors, new.categories, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, title, authors, categories, summary)
+    VALUES ('delete', old.id, old.title, old.authors, old.categories, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, title, authors, categories, summary)
+    VALUES ('delete', old.id, old.title, old.authors, old.categories, old.summary);
+    INSERT INTO entries_fts (rowid, title, authors, categories, summary)
+    VALUES (new.id, new.title, new.authors, new.categories, new.summary);
+END;
+"""
+
+# Rows that did not change are left alone, so unchanged entries cost no index updates
+UPSERT = """
+INSERT INTO entries (source, key, guid, url, title, authors, summary, categories, published, published_at, archived_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, key) DO UPDATE SET
+    guid = excluded.guid, url = excluded.url, title = excluded.title, authors = excluded.authors,
+    summary = excluded.summary, categories = excluded.categories,
+    published = excluded.published, published_at = excluded.published_at
+WHERE entries.guid IS NOT excluded.guid OR entries.url IS NOT excluded.url OR entries.title IS NOT excluded.title
+    OR entries.authors IS NOT excluded.authors OR entries.summary IS NOT excluded.summary
+    OR entries.categories IS NOT excluded.categories OR entries.published IS NOT excluded.published
+"""
+
+COLUMNS = 'guid, url, title, authors, summary, categories, published, source'
+
+def connect(path=None):
+    """Open the archive, creating it and its index if needed"""
+    path = Path(path or ARCHIVE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Generators running in parallel write to the same archive
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.executescript(SCHEMA)
+    return connection
+
+def _row(entry, now):
+    published = entry.published
+    return (
+        entry.source or '', entry.key, entry.guid, entry.url, entry.title or '',
+        LIST_SEPARATOR.join(entry.authors), entry.summary or '', LIST_SEPARATOR.join(entry.categories),
+        published.isoformat() if published else None, published.timestamp() if published else None, now,
+    )
+
+def _item(row):
+    guid, url, title, authors, summary, categories, published, source = row
+    return FeedItem(url, title, summary, datetime.fromisoformat(published) if published else None, guid,
+                    authors.split(LIST_SEPARATOR) if authors else (),
+                    categories.split(LIST_SEPARATOR) if categories else (), source)
+
+def archive_entries(entries, path=None):
+    """Insert new entries and update changed ones, keyed by source and GUID or link; returns the number written"""
+    now = time.time()
+    with closing(connect(path)) as connection:
+        with connection:
+            # Rows inserted or updated, not counting the index updates of the triggers
+            return connection.executemany(UPSERT, [_row(entry, now) for entry in entries]).rowcount
+
+def quote(text):
+    """An FTS5 string, matched as a phrase"""
+    return '"' + text.replace('"', '""') + '"'
+
+def search(query=None, source=None, category=None, days=None, limit=50, order='date', path=None):
+    """Archived entries matching an FTS5 query, newest first (or best match first with order='rank').
+
+    `query` uses FTS5 syntax: words, "phrases", AND/OR/NOT and column filters such as title:agents.
+    `category` matches a phrase in the categories, e.g. cs.AI; `days` keeps entries published in
+    the last days. An entry archived from several sources is returned once.
+    """
+    match = []
+    if query:
+        match.append(f"({query})")
+    if category:
+        match.append(f"categories : {quote(category)}")
+
+    sql = f"SELECT {', '.join(f'entries.{column}' for column in COLUMNS.split(', '))} FROM entries"
+    conditions, params = [], []
+    if match:
+        sql += " JOIN entries_fts ON entries_fts.rowid = entries.id"
+        conditions.append("entries_fts MATCH ?")
+        params.append(' AND '.join(match))
+    if source:
+        conditions.append("entries.source = ?")
+        params.append(source)
+    if days:
+        conditions.append("entries.published_at >= ?")
+        params.append(time.time() - days * 86400)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if order == 'rank' and match:
+        sql += " ORDER BY entries_fts.rank"
+    else:
+        sql += " ORDER BY entries.published_at IS NULL, entries.published_at DESC"
+
+    results, seen = [], set()
+    with closing(connect(path)) as connection:
+        for row in connection.execute(sql, params):
+            item = _item(row)
+            if item.key in seen:
+                continue
+            seen.add(item.key)
+            results.append(item)
+            if limit and len(results) >= limit:
+                break
+    return results
+
+def write_search_feed(saved_search, path=None):
+    """Write the feed of a saved search from the archive; returns its entries"""
+    from feed_generators.feed_writer import write_feed
+
+    entries = search(saved_search.query, saved_search.source, saved_search.category, saved_search.days,
+                     saved_search.max_entries, path=path)
+    channel = {
+        'title': saved_search.title,
+        'link': saved_search.link,
+        'description': saved_search.description,
+        'language': 'en',
+    }
+    # The feed is newest first, like the search results
+    write_feed(saved_search.output, channel, entries, incremental=False, order='newest')
+    return entries
+
+def main(argv=None):
+    from feed_generators import registry
+
+    parser = argparse.ArgumentParser(description="Search the entry archive and write saved-search feeds")
+    parser.add_argument('--archive', default=ARCHIVE_PATH, help="archive database (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = commands.add_parser('search', help="print the archived entries matching a query")
+    search_parser.add_argument('query', nargs='?', help="FTS5 query, e.g. '\"reinforcement learning\" NOT survey'")
+    search_parser.add_argument('--source', choices=registry.feed_names(), help="only entries of this feed")
+    search_parser.add_argument('--category', help="only entries in this category, e.g. cs.AI")
+    search_parser.add_argument('--days', type=float, help="only entries published in the last DAYS days")
+    search_parser.add_argument('--limit', type=int, default=20, help="number of entries (default: 20)")
+    search_parser.add_argument('--rank', action='store_true', help="best match first instead of newest first")
+    search_parser.add_argument('--json', action='store_true', help="print the entries as JSON rows")
+
+    saved_parser = commands.add_parser('saved', help="write the feeds of saved searches (default: all)")
+    saved_parser.add_argument('names', nargs='*', metavar='NAME', help="saved searches: %s" % ', '.join(registry.search_names()))
+    saved_parser.add_argument('--list', action='store_true', help="list the saved searches and exit")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'search':
+            entries = search(args.query, args.source, args.category, args.days, args.limit,
+                             'rank' if args.rank else 'date', args.archive)
+            if args.json:
+                print(json.dumps([entry.as_row() for entry in entries], ensure_ascii=False, indent=1))
+                return
+            for entry in entries:
+                date = entry.published.strftime('%Y-%m-%d') if entry.published else '-' * 10
+                print(f"{date}  {entry.source:<24} {entry.title}\n{'':12}{entry.url}")
+            print(f"{len(entries)} entries")
+        elif args.list:
+            for saved_search in registry.SEARCHES:
+                print(f"{saved_search.name:<24} {saved_search.output:<36} {saved_search.query}")
+        else:
+            for saved_search in registry.select_searches(args.names):
+                entries = write_search_feed(saved_search, args.archive)
+                print(f"✓ {saved_search.name}: {len(entries)} entries")
+    except (sqlite3.Error, ValueError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Persistent JSON store of resolved article metadata keyed by article URL
+"""
+
+import time
+from datetime import datetime
+
+from feed_generators.store import JsonStore
+
+class ArticleStore(JsonStore):
+    """Remember the publish date, title and description resolved for each article URL.
+
+    Publish dates never change after publication, so a stored record lets a generator
+    skip downloading the article page again. Records older than `max_age` seconds
+    are treated as missing so they get re-validated.
+    """
+
+    def __init__(self, path, max_age=None):
+        super().__init__(path)
+        self.max_age = max_age
+
+    def get(self, url):
+        """Return the stored record for a url with pub_date as datetime, or None"""
+        record = self.records.get(url)
+        if not record or not record.get('pub_date'):
+            return None
+        if self.max_age and time.time() - record.get('checked_at', 0) > self.max_age:
+            return None
+        try:
+            pub_date = datetime.fromisoformat(record['pub_date'])
+        except ValueError:
+            return None
+        return dict(record, pub_date=pub_date)
+
+    def put(self, url, pub_date, title, description):
+        """Store the resolved metadata for a url"""
+        self.records[url] = {
+            'pub_date': pub_date.isoformat(),
+            'title': title,
+            'description': description,
+            'checked_at': time.time(),
+        }
+        self.dirty = True
@@ -0,0 +1,136 @@
+"""
+Incremental ingestion of arXiv listings through the export API (Atom query interface)
+https://info.arxiv.org/help/api/user-manual.html
+"""
+
+import json
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode
+
+from feed_generators import metrics
+from feed_generators.date_utils import parse_date_string
+from feed_generators.http_cache import CACHE_DIR
+from feed_generators.http_utils import fetch
+from feed_generators.store import write_atomic
+
+API_URL = "https://export.arxiv.org/api/query"
+API_PAGE_SIZE = int(os.environ.get('ARXIV_API_PAGE_SIZE', '200'))
+API_DELAY = float(os.environ.get('ARXIV_API_DELAY', '3'))  # arXiv asks for 3 seconds between calls
+
+NAMESPACES = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'arxiv': 'http://arxiv.org/schemas/atom',
+}
+
+def build_query_url(category, start=0, max_results=API_PAGE_SIZE):
+    """Build an API query for the newest submissions in a category"""
+    return API_URL + '?' + urlencode({
+        'search_query': f'cat:{category}',
+        'sortBy': 'submittedDate',
+        'sortOrder': 'descending',
+        'start': start,
+        'max_results': max_results,
+    })
+
+def _text(element, path):
+    value = element.findtext(path, default='', namespaces=NAMESPACES)
+    return ' '.join(value.split())
+
+def parse_atom(content):
+    """Parse an API response into a list of record dicts, newest first as returned by the API"""
+    root = ET.fromstring(content)
+    records = []
+    for entry in root.findall('atom:entry', NAMESPACES):
+        entry_id = _text(entry, 'atom:id')
+        if '/abs/' not in entry_id:
+            # The API reports errors as an entry without an abstract link
+            continue
+        arxiv_id = re.sub(r'v\d+$', '', entry_id.rsplit('/abs/', 1)[1])
+
+        primary = entry.find('arxiv:primary_category', NAMESPACES)
+        records.append({
+            'arxiv_id': arxiv_id,
+            'url': f"https://arxiv.org/abs/{arxiv_id}",
+            'title': _text(entry, 'atom:title'),
+            'authors': [_text(author, 'atom:name') for author in entry.findall('atom:author', NAMESPACES)],
+            'summary': _text(entry, 'atom:summary'),
+            'primary_category': primary.get('term') if primary is not None else None,
+            'categories': [category.get('term') for category in entry.findall('atom:category', NAMESPACES)],
+            'published': parse_date_string(_text(entry, 'atom:published')),
+            'updated': parse_date_string(_text(entry, 'atom:updated')),
+        })
+    return records
+
+def fetch_new_records(category, since=None, max_records=500, page_size=API_PAGE_SIZE, delay=API_DELAY):
+    """Page through the newest submissions of a category until `since` or `max_records` is reached"""
+    records = []
+    seen_ids = set()
+    start = 0
+    while len(records) < max_records:
+        if start and delay:
+            time.sleep(delay)
+        content = fetch(build_query_url(category, start, page_size), timeout=60)
+        with metrics.stage('parse'):
+            page = parse_atom(content)
+        new_on_page = 0
+        for record in page:
+            if since and record['published'] and record['published'] < since:
+                return records
+            if record['arxiv_id'] in seen_ids:
+                continue
+            seen_ids.add(record['arxiv_id'])
+            records.append(record)
+            new_on_page += 1
+            if len(records) >= max_records:
+                break
+        # A short or repeated page means the listing is exhausted
+        if len(page) < page_size or not new_on_page:
+            break
+        start += page_size
+    return records
+
+def _state_path(category):
+    return Path(CACHE_DIR) / f"arxiv_api_{category}.json"
+
+def load_records(category):
+    """Load the stored records of a category, newest first"""
+    try:
+        state = json.loads(_state_path(category).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return []
+    records = state.get('records', [])
+    for record in records:
+        for key in ('published', 'updated'):
+            if record.get(key):
+                record[key] = datetime.fromisoformat(record[key])
+    return records
+
+def save_records(category, records):
+    """Store records of a category together with the watermark of the newest one"""
+    path = _state_path(category)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    serializable = [
+        dict(record, **{key: record[key].isoformat() for key in ('published', 'updated') if record.get(key)})
+        for record in records
+    ]
+    watermark = serializable[0].get('published') if serializable else None
+    write_atomic(path, json.dumps({'watermark': watermark, 'records': serializable}, ensure_ascii=False))
+
+def update_records(category, max_records=500):
+    """Pull submissions newer than the stored watermark and return the newest `max_records` records"""
+    stored = load_records(category)
+    watermark = max((record['published'] for record in stored if record.get('published')), default=None)
+    new_records = fetch_new_records(category, since=watermark, max_records=max_records)
+
+    new_ids = {record['arxiv_id'] for record in new_records}
+    records = new_records + [record for record in stored if record['arxiv_id'] not in new_ids]
+    records.sort(key=lambda record: record['published'] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+    records = records[:max_records]
+
+    save_records(category, records)
+    return records
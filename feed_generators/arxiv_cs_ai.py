@@ -2,221 +2,465 @@
 """
 RSS Feed Generator for arXiv cs.AI (Computer Science - Artificial Intelligence)
 https://arxiv.org/list/cs.AI/recent?skip=0&show=500
-Generates feed with 500 most recent papers.
+Generates feed with 500 most recent papers, or with every new paper when the listing is fetched in pages.
+With ARXIV_SOURCE=categories, writes a feed for each of several categories and a combined feed.
 """
 
-import requests
-from bs4 import BeautifulSoup
-from feedgen.feed import FeedGenerator
+from bs4 import SoupStrainer
 from datetime import datetime, timezone
+import os
 import re
-from feed_generators.date_utils import parse_date_string, get_fallback_date
+import sqlite3
+from feed_generators import archive, metrics, routing
+from feed_generators.arxiv_api import update_records
+from feed_generators.feed_writer import load_feed_entries, write_feed
+from feed_generators.html_utils import make_soup
+from feed_generators.http_utils import fetch, fetch_iter
+from feed_generators.items import FeedItem
+from feed_generators.pipeline import Source
+from feed_generators.registry import category_feeds_for, get_feed
 
-def generate_feed():
-    url = "https://arxiv.org/list/cs.AI/recent?skip=0&show=500"
+FEED = get_feed('arxiv_cs_ai')
+
+# 'html' scrapes the recent listing page, 'pages' scrapes it in several pages until papers already
+# in the feed are reached, 'api' pulls new submissions incrementally from the export API,
+# 'categories' scrapes the recent listings of ARXIV_CATEGORIES
+ARXIV_SOURCE = os.environ.get('ARXIV_SOURCE', 'html')
+
+# Paginated listing: pages of ARXIV_PAGE_SIZE entries, at most ARXIV_PAGE_WORKERS fetched at once
+ARXIV_PAGE_SIZE = int(os.environ.get('ARXIV_PAGE_SIZE', '250'))
+ARXIV_PAGE_WORKERS = int(os.environ.get('ARXIV_PAGE_WORKERS', '4'))
+ARXIV_PAGE_RATE = float(os.environ.get('ARXIV_PAGE_RATE', '1'))  # page requests per second
+ARXIV_MAX_ENTRIES = int(os.environ.get('ARXIV_MAX_ENTRIES', '2000'))
+
+# Categories: one feed per category (feed_arxiv_cs_lg.xml for cs.LG) and a combined feed of all their papers,
+# registered with ARXIV_CATEGORIES and ARXIV_COMBINED_OUTPUT (see registry.CATEGORY_FEEDS)
+CATEGORY_FEEDS = category_feeds_for(FEED.name)
+ARXIV_CATEGORIES = CATEGORY_FEEDS.categories
+ARXIV_COMBINED_OUTPUT = CATEGORY_FEEDS.combined_output
+
+LISTING_URL = FEED.url.split('?')[0]
+LISTING_TOTAL_RE = re.compile(rb'Total of (\d+) entries')
+ARXIV_URL_ID_RE = re.compile(r'/abs/(\d{4}\.\d{4,5})')
+
+# Entries live in <dl> blocks; parsing only those skips the page chrome,
+# so parse time and memory scale with the number of entries
+LISTING_STRAINER = SoupStrainer('dl')
+
+def arxiv_item(arxiv_url, title, description, pub_date, authors=(), categories=()):
+    """Feed item for a paper; its abstract URL doubles as GUID"""
+    return FeedItem(arxiv_url, title, description, pub_date, guid=arxiv_url,
+                    authors=authors, categories=categories, source=FEED.name)
+
+def iter_listing_pairs(soup):
+    """Yield (dt, dd, heading) for each paper in the listing; heading is the text of the day heading above it"""
+    # Find the main content area
+    content_area = soup.find('div', id='content') or soup.find('body')
+    if not content_area:
+        content_area = soup
     
-    try:
-        response = requests.get(url, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        fg = FeedGenerator()
-        fg.title('arXiv cs.AI (Computer Science - Artificial Intelligence)')
-        fg.link(href=url, rel='alternate')
-        fg.description('Recent papers from arXiv cs.AI category')
-        fg.language('en')
-        
-        # arXiv uses a specific structure with dl/dt/dd tags
-        entries = []
-        
-        # Find the main content area
-        content_area = soup.find('div', id='content') or soup.find('body')
-        if not content_area:
-            content_area = soup
+    # arXiv uses a specific structure with dl/dt/dd tags, with an h3 heading for each announcement day
+    for dl in content_area.find_all('dl'):
+        heading = None
+        dt = None
+        for element in dl.find_all(['h3', 'dt', 'dd'], recursive=False):
+            if element.name == 'h3':
+                heading = element.get_text(strip=True)
+            elif element.name == 'dt':
+                dt = element
+            elif dt is not None:
+                yield dt, element, heading
+                dt = None
+
+def listing_link(dt):
+    """(arXiv ID, abstract link element) of a listing entry, or None; arxiv.org links are relative (/abs/2604.12345)"""
+    link_elem = dt.find('a', href=ARXIV_URL_ID_RE)
+    if not link_elem:
+        return None
+    return ARXIV_URL_ID_RE.search(link_elem['href']).group(1), link_elem
+
+def iter_listing_entries(soup):
+    """Yield a FeedItem for each dt/dd pair of the listing, undated if no date is found"""
+    for dt, dd, heading in iter_listing_pairs(soup):
+        link = listing_link(dt)
+        if link:
+            arxiv_id, link_elem = link
+            yield listing_entry(f"https://arxiv.org/abs/{arxiv_id}", link_elem.get_text(strip=True), dd, heading)
+
+def listing_entry(arxiv_url, arxiv_id, dd, heading=None):
+    """FeedItem for a paper from the dd element of its listing entry; arxiv_id is the text of its link"""
+    # Extract title
+    title_elem = dd.find('div', class_='list-title')
+    if title_elem:
+        title = title_elem.get_text(strip=True).replace('Title:', '').strip()
+    else:
+        title = f"arXiv:{arxiv_id}"
+
+    # Extract authors
+    authors_elem = dd.find('div', class_='list-authors')
+    authors = ""
+    if authors_elem:
+        authors = authors_elem.get_text(strip=True).replace('Authors:', '').strip()
+
+    # Extract abstract
+    abstract_elem = dd.find('p', class_='mathjax')
+    abstract = abstract_elem.get_text(strip=True) if abstract_elem else ""
+
+    # Extract subjects
+    subjects_elem = dd.find('div', class_='list-subjects')
+    subjects = ""
+    if subjects_elem:
+        subjects = subjects_elem.get_text(strip=True).replace('Subjects:', '').strip()
+
+    author_names = [name.strip() for name in authors.split(',') if name.strip()]
+    categories = [subject.strip() for subject in subjects.split(';') if subject.strip()]
+
+    # Build description
+    description_parts = []
+    if authors:
+        description_parts.append(f"Authors: {', '.join(author_names)}")
+    if subjects:
+        description_parts.append(f"Subjects: {subjects}")
+    if abstract:
+        description_parts.append(f"\n{abstract}")
+
+    description = "\n".join(description_parts)
+
+    # Extract date from arXiv
+    pub_date = None
+
+    # Method 1: Try to extract from list-date div, else from the heading of the day the paper was announced
+    date_elem = dd.find('div', class_='list-date')
+    date_str = date_elem.get_text(strip=True) if date_elem else heading
+    if date_str:
+        # arXiv dates are usually in format like "Submitted on 1 Jan 2025" or "Submitted on 1 Jan 2025 (v1), 15 Jan 2025 (v2)"
+        # Extract the first date (submission date)
+        date_match = re.search(r'(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+(\d{4})', date_str, re.I)
+        if date_match:
+            day, month_str, year = date_match.groups()
+            month_map = {
+                'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4,
+                'may': 5, 'jun': 6, 'jul': 7, 'aug': 8,
+                'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+            }
+            month = month_map.get(month_str.lower()[:3], 1)
+            pub_date = datetime(int(year), month, int(day), tzinfo=timezone.utc)
+
+    # Method 2: Extract date from arXiv ID (format: YYMM.NNNNN)
+    # arXiv IDs contain year and month: YYMM
+    if not pub_date and arxiv_id:
+        arxiv_id_match = re.search(r'(\d{2})(\d{2})\.\d+', arxiv_id)
+        if arxiv_id_match:
+            yy, mm = arxiv_id_match.groups()
+            year = 2000 + int(yy) if int(yy) < 50 else 1900 + int(yy)
+            month = int(mm)
+            # Use 15th of month as default day
+            pub_date = datetime(year, month, 15, tzinfo=timezone.utc)
+
+    # Method 3: Extract from URL if it contains date
+    if not pub_date:
+        url_date_match = re.search(r'/(\d{4})(\d{2})(\d{2})', arxiv_url)
+        if url_date_match:
+            year, month, day = url_date_match.groups()
+            pub_date = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+
+    # If still no date, the source gives it a fallback date
+    return arxiv_item(arxiv_url, title, description, pub_date, author_names, categories)
+
+def iter_link_entries(soup):
+    """Yield undated entries for bare links to arXiv papers when the listing structure is not found"""
+    # Look for links to arxiv papers - try multiple patterns
+    arxiv_links = soup.find_all('a', href=re.compile(r'arxiv\.org/abs/|/abs/\d'))
+    seen_urls = set()
+    
+    for link in arxiv_links[:500]:
+        arxiv_url = link.get('href', '')
+        if not arxiv_url:
+            continue
+
+        # Normalize URL
+        if not arxiv_url.startswith('http'):
+            if arxiv_url.startswith('/'):
+                arxiv_url = f"https://arxiv.org{arxiv_url}"
+            elif arxiv_url.startswith('abs/'):
+                arxiv_url = f"https://arxiv.org/{arxiv_url}"
+            else:
+                arxiv_url = f"https://arxiv.org/abs/{arxiv_url}"
+
+        if arxiv_url in seen_urls:
+            continue
+        seen_urls.add(arxiv_url)
+
+        # Extract arXiv ID from URL
+        arxiv_id_match = re.search(r'/(\d{4}\.\d{4,5})', arxiv_url)
+        if arxiv_id_match:
+            arxiv_id = arxiv_id_match.group(1)
+        else:
+            arxiv_id = link.get_text(strip=True) or "unknown"
+
+        title = f"arXiv:{arxiv_id}"
+
+        # Try to find title nearby
+        parent = link.parent
+        if parent:
+            title_elem = parent.find(['span', 'div'], class_=re.compile(r'title', re.I))
+            if not title_elem:
+                # Look for title in siblings
+                for sibling in parent.find_next_siblings():
+                    title_elem = sibling.find(['span', 'div', 'strong'], class_=re.compile(r'title', re.I))
+                    if title_elem:
+                        break
+            if title_elem:
+                title = title_elem.get_text(strip=True)
         
-        dl_elements = content_area.find_all('dl')
+        yield arxiv_item(arxiv_url, title, "", None)
+
+def parse_listing(content):
+    """Parse the <dl> blocks of a listing page, keeping the page itself for the bare-link fallback"""
+    return make_soup(content, parse_only=LISTING_STRAINER), content
+
+def iter_entries(listing):
+    """Yield entries of a parse_listing() result as they are extracted, falling back to bare links if there are none"""
+    soup, content = listing
+    found = False
+    for entry in iter_listing_entries(soup):
+        found = True
+        yield entry
+    
+    # If no entries found with dl/dt/dd structure, try alternative parsing
+    if not found:
+        # The strained soup only has the <dl> blocks, so links elsewhere on the page need all of it
+        yield from iter_link_entries(make_soup(content))
+
+def page_url(skip, show=ARXIV_PAGE_SIZE):
+    return f"{LISTING_URL}?skip={skip}&show={show}"
+
+def arxiv_id_from_url(arxiv_url):
+    match = ARXIV_URL_ID_RE.search(arxiv_url)
+    return match.group(1) if match else arxiv_url
+
+def parse_listing_page(content):
+    """Parse one page of the listing into (total entries in the listing, entries of the page)"""
+    match = LISTING_TOTAL_RE.search(content)
+    total = int(match.group(1)) if match else None
+    return total, list(iter_entries(parse_listing(content)))
+
+def iter_listing_pages(page_size=None, max_entries=None, max_workers=None, rate=None, known_ids=()):
+    """Yield listing entries page by page, newest first, deduplicated by arXiv ID.
+
+    The first page tells how long the listing is; the rest are fetched concurrently and parsed
+    as they arrive. Iteration stops at the first paper in `known_ids`, cancelling the pages
+    that have not been fetched yet.
+    """
+    page_size = page_size or ARXIV_PAGE_SIZE
+    max_entries = max_entries or ARXIV_MAX_ENTRIES
+    known_ids = set(known_ids)
+    seen_ids = set()
+
+    def take(entries):
+        """Yield the new entries of a page; returns True once a known paper or the limit is reached"""
+        for entry in entries:
+            arxiv_id = arxiv_id_from_url(entry.url)
+            if arxiv_id in known_ids or len(seen_ids) >= max_entries:
+                return True
+            if arxiv_id in seen_ids:
+                continue
+            seen_ids.add(arxiv_id)
+            yield entry
+        return False
+
+    total, entries = parse_listing_page(fetch(page_url(0, page_size)))
+    if (yield from take(entries)) or not total:
+        return
+
+    urls = [page_url(skip, page_size) for skip in range(page_size, min(total, max_entries), page_size)]
+    pages = fetch_iter(
+        urls,
+        lambda url: parse_listing_page(fetch(url)),
+        max_workers=max_workers or ARXIV_PAGE_WORKERS,
+        rate_per_host=rate if rate is not None else ARXIV_PAGE_RATE,
+    )
+    try:
+        for url, page in zip(urls, pages):
+            if page is None:
+                print(f"Warning: could not fetch {url}, skipping its entries")
+                continue
+            if (yield from take(page[1])):
+                return
+    finally:
+        pages.close()
+
+def fetch_new_listing_entries(url=None):
+    """Entries of the papers listed since the previous run, taken from the existing feed"""
+    known_ids = {arxiv_id_from_url(entry.key) for entry in load_feed_entries(FEED.output)}
+    return list(iter_listing_pages(known_ids=known_ids))
+
+def iter_api_entries(records):
+    """Yield entries for records pulled from the arXiv export API, with exact submission timestamps"""
+    for record in records:
+        # Build description the same way as for the listing page
+        description_parts = []
+        if record['authors']:
+            description_parts.append(f"Authors: {', '.join(record['authors'])}")
+        if record['categories']:
+            description_parts.append(f"Subjects: {'; '.join(record['categories'])}")
+        if record['summary']:
+            description_parts.append(f"\n{record['summary']}")
         
-        for dl in dl_elements:
-            dt_elements = dl.find_all('dt')
-            dd_elements = dl.find_all('dd')
-            
-            for i, dt in enumerate(dt_elements):
-                if i >= len(dd_elements):
-                    break
-                
-                dd = dd_elements[i]
-                
-                # Extract arXiv ID and link - try multiple patterns
-                link_elem = dt.find('a', href=re.compile(r'arxiv\.org/abs/'))
-                if not link_elem:
-                    # Try finding link in the dt element text
-                    link_elem = dt.find('a', href=True)
-                    if link_elem and 'arxiv' in link_elem.get('href', '').lower():
-                        # Make sure it's a full URL
-                        href = link_elem['href']
-                        if not href.startswith('http'):
-                            if href.startswith('/'):
-                                link_elem['href'] = f"https://arxiv.org{href}"
-                            else:
-                                link_elem['href'] = f"https://arxiv.org/abs/{href}"
-                    else:
+        yield arxiv_item(record['url'], record['title'], "\n".join(description_parts), record['published'],
+                         record['authors'], record['categories'])
+
+CHANNEL = {
+    'title': 'arXiv cs.AI (Computer Science - Artificial Intelligence)',
+    'description': 'Recent papers from arXiv cs.AI category',
+}
+
+# The listing page is structured, so entries are extracted from its dt/dd pairs directly
+HTML_SOURCE = Source(
+    FEED,
+    channel=CHANNEL,
+    parse=parse_listing,
+    entries=iter_entries,
+)
+
+# Pages stop at papers already in the feed, so older entries are kept by merging with it
+PAGES_SOURCE = Source(
+    FEED,
+    channel=CHANNEL,
+    fetch=fetch_new_listing_entries,
+    parse=list,
+    entries=iter,
+    max_entries=ARXIV_MAX_ENTRIES,
+    incremental=True,
+)
+
+API_SOURCE = Source(
+    FEED,
+    channel=CHANNEL,
+    fetch=lambda url: update_records('cs.AI', max_records=FEED.max_entries),
+    parse=list,
+    entries=iter_api_entries,
+)
+
+SOURCES = {'html': HTML_SOURCE, 'pages': PAGES_SOURCE, 'api': API_SOURCE}
+
+def category_url(category):
+    return f"https://arxiv.org/list/{category}/recent?skip=0&show={FEED.max_entries}"
+
+def category_output(category):
+    return CATEGORY_FEEDS.output(category)
+
+def category_channel(category):
+    channel = CHANNEL if category == 'cs.AI' else {
+        'title': f'arXiv {category}',
+        'description': f'Recent papers from arXiv {category} category',
+    }
+    return dict({'link': category_url(category), 'language': 'en'}, **channel)
+
+def arxiv_id_key(arxiv_id):
+    """Sort key of a new-style arXiv ID; IDs grow with submission time"""
+    yymm, number = arxiv_id.split('.')
+    return int(yymm), int(number)
+
+def fetch_category_papers(categories, max_workers=None, rate=None):
+    """Fetch the recent listings of several categories concurrently and parse each paper once.
+
+    Listings are parsed as they arrive and walked in the order of `categories`. A paper is
+    extracted from the first listing that has it; later listings only add their category to its
+    memberships. Returns {arXiv ID: entry} and {arXiv ID: categories of the listings that have it}.
+    """
+    urls = [category_url(category) for category in categories]
+    listings = fetch_iter(
+        urls,
+        lambda url: make_soup(fetch(url), parse_only=LISTING_STRAINER),
+        max_workers=max_workers or ARXIV_PAGE_WORKERS,
+        rate_per_host=rate if rate is not None else ARXIV_PAGE_RATE,
+    )
+    papers = {}
+    memberships = {}
+    try:
+        for category, url, soup in zip(categories, urls, listings):
+            if soup is None:
+                print(f"Warning: could not fetch {url}, skipping its papers")
+                continue
+            with metrics.stage('extract'):
+                for dt, dd, heading in iter_listing_pairs(soup):
+                    link = listing_link(dt)
+                    if not link:
                         continue
-                
-                arxiv_url = link_elem['href']
-                if not arxiv_url.startswith('http'):
-                    arxiv_url = f"https://{arxiv_url}"
-                
-                arxiv_id = link_elem.get_text(strip=True)
-                
-                # Extract title
-                title_elem = dd.find('div', class_='list-title')
-                if title_elem:
-                    title = title_elem.get_text(strip=True).replace('Title:', '').strip()
-                else:
-                    title = f"arXiv:{arxiv_id}"
-                
-                # Extract authors
-                authors_elem = dd.find('div', class_='list-authors')
-                authors = ""
-                if authors_elem:
-                    authors = authors_elem.get_text(strip=True).replace('Authors:', '').strip()
-                
-                # Extract abstract
-                abstract_elem = dd.find('p', class_='mathjax')
-                abstract = abstract_elem.get_text(strip=True) if abstract_elem else ""
-                
-                # Extract subjects
-                subjects_elem = dd.find('div', class_='list-subjects')
-                subjects = ""
-                if subjects_elem:
-                    subjects = subjects_elem.get_text(strip=True).replace('Subjects:', '').strip()
-                
-                # Build description
-                description_parts = []
-                if authors:
-                    description_parts.append(f"Authors: {authors}")
-                if subjects:
-                    description_parts.append(f"Subjects: {subjects}")
-                if abstract:
-                    description_parts.append(f"\n{abstract}")
-                
-                description = "\n".join(description_parts)
-                
-                # Extract date from arXiv
-                pub_date = None
-                
-                # Method 1: Try to extract from list-date div
-                date_elem = dd.find('div', class_='list-date')
-                if date_elem:
-                    date_str = date_elem.get_text(strip=True)
-                    # arXiv dates are usually in format like "Submitted on 1 Jan 2025" or "Submitted on 1 Jan 2025 (v1), 15 Jan 2025 (v2)"
-                    # Extract the first date (submission date)
-                    date_match = re.search(r'(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+(\d{4})', date_str, re.I)
-                    if date_match:
-                        day, month_str, year = date_match.groups()
-                        month_map = {
-                            'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4,
-                            'may': 5, 'jun': 6, 'jul': 7, 'aug': 8,
-                            'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
-                        }
-                        month = month_map.get(month_str.lower()[:3], 1)
-                        pub_date = datetime(int(year), month, int(day), tzinfo=timezone.utc)
-                
-                # Method 2: Extract date from arXiv ID (format: YYMM.NNNNN)
-                # arXiv IDs contain year and month: YYMM
-                if not pub_date and arxiv_id:
-                    arxiv_id_match = re.search(r'(\d{2})(\d{2})\.\d+', arxiv_id)
-                    if arxiv_id_match:
-                        yy, mm = arxiv_id_match.groups()
-                        year = 2000 + int(yy) if int(yy) < 50 else 1900 + int(yy)
-                        month = int(mm)
-                        # Use 15th of month as default day
-                        pub_date = datetime(year, month, 15, tzinfo=timezone.utc)
-                
-                # Method 3: Extract from URL if it contains date
-                if not pub_date:
-                    url_date_match = re.search(r'/(\d{4})(\d{2})(\d{2})', arxiv_url)
-                    if url_date_match:
-                        year, month, day = url_date_match.groups()
-                        pub_date = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
-                
-                # If still no date, use decreasing time offset for ordering
-                if not pub_date:
-                    # Use days instead of hours for better spacing
-                    from datetime import timedelta
-                    offset_days = len(entries) * 2  # Each entry is 2 days older
-                    pub_date = datetime.now(timezone.utc) - timedelta(days=offset_days)
-                
-                # Create feed entry
-                fe = fg.add_entry()
-                fe.title(title)
-                fe.link(href=arxiv_url)
-                fe.description(description)
-                fe.pubDate(pub_date)
-                fe.guid(arxiv_url, permalink=True)
-                
-                entries.append(arxiv_id)
-        
-        # If no entries found with dl/dt/dd structure, try alternative parsing
-        if len(entries) == 0:
-            # Look for links to arxiv papers - try multiple patterns
-            arxiv_links = soup.find_all('a', href=re.compile(r'arxiv\.org/abs/|/abs/\d'))
-            seen_urls = set()
-            
-            for link in arxiv_links[:500]:
-                arxiv_url = link.get('href', '')
-                if not arxiv_url:
-                    continue
-                    
-                # Normalize URL
-                if not arxiv_url.startswith('http'):
-                    if arxiv_url.startswith('/'):
-                        arxiv_url = f"https://arxiv.org{arxiv_url}"
-                    elif arxiv_url.startswith('abs/'):
-                        arxiv_url = f"https://arxiv.org/{arxiv_url}"
-                    else:
-                        arxiv_url = f"https://arxiv.org/abs/{arxiv_url}"
-                
-                if arxiv_url in seen_urls:
-                    continue
-                seen_urls.add(arxiv_url)
-                
-                # Extract arXiv ID from URL
-                arxiv_id_match = re.search(r'/(\d{4}\.\d{4,5})', arxiv_url)
-                if arxiv_id_match:
-                    arxiv_id = arxiv_id_match.group(1)
-                else:
-                    arxiv_id = link.get_text(strip=True) or "unknown"
-                
-                title = f"arXiv:{arxiv_id}"
-                
-                # Try to find title nearby
-                parent = link.parent
-                if parent:
-                    title_elem = parent.find(['span', 'div'], class_=re.compile(r'title', re.I))
-                    if not title_elem:
-                        # Look for title in siblings
-                        for sibling in parent.find_next_siblings():
-                            title_elem = sibling.find(['span', 'div', 'strong'], class_=re.compile(r'title', re.I))
-                            if title_elem:
-                                break
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-                
-                fe = fg.add_entry()
-                fe.title(title)
-                fe.link(href=arxiv_url)
-                fe.description("")
-                fe.pubDate(get_fallback_date(len(entries)))
-                fe.guid(arxiv_url, permalink=True)
-                entries.append(arxiv_id)
-        
-        # Write RSS feed
-        fg.rss_file('feed_arxiv_cs_ai.xml')
-        print(f"Generated feed_arxiv_cs_ai.xml with {len(entries)} entries")
+                    arxiv_id, link_elem = link
+                    if arxiv_id not in papers:
+                        papers[arxiv_id] = listing_entry(f"https://arxiv.org/abs/{arxiv_id}", link_elem.get_text(strip=True), dd, heading)
+                    memberships.setdefault(arxiv_id, []).append(category)
+    finally:
+        listings.close()
+    return papers, memberships
+
+def merge_memberships(papers, memberships, categories):
+    """Give each paper the categories of the listings that have it and of its subjects.
+
+    A paper cross-listed in a category belongs to that category's feed even if it is past the
+    end of its listing. Listing categories missing from its subjects are added to its categories.
+    Returns {category: arXiv IDs}.
+    """
+    wanted = {category.lower(): category for category in categories}
+    members = {category: set() for category in categories}
+    for arxiv_id, entry in papers.items():
+        keys = {key for subject in entry.categories for key in routing.subject_keys(subject)}
+        listed = [category for category in memberships.get(arxiv_id, ()) if category.lower() not in keys]
+        if listed:
+            entry.categories += tuple(listed)
+        for key in keys.union(category.lower() for category in listed):
+            if key in wanted:
+                members[wanted[key]].add(arxiv_id)
+    return members
+
+def generate_category_feeds(categories=None):
+    """Write a feed for each category and a combined feed from one shared set of papers"""
+    categories = list(dict.fromkeys(categories or ARXIV_CATEGORIES))
+    papers, memberships = fetch_category_papers(categories)
+    members = merge_memberships(papers, memberships, categories)
+
+    # Newest first across all listings
+    ids = sorted(papers, key=arxiv_id_key, reverse=True)
+    for category in categories:
+        entries = [papers[arxiv_id] for arxiv_id in ids if arxiv_id in members[category]][:FEED.max_entries]
+        write_feed(category_output(category), category_channel(category), entries, max_entries=FEED.max_entries, count=False)
+        print(f"✓ {category}: {len(entries)} papers")
+        if category == CATEGORY_FEEDS.routed_category and routing.ROUTES:
+            routing.write_routes(FEED, category_channel(category), entries, max_entries=FEED.max_entries)
+
+    entries = [papers[arxiv_id] for arxiv_id in ids][:ARXIV_MAX_ENTRIES]
+    channel = {
+        'title': f"arXiv {', '.join(categories)}",
+        'link': 'https://arxiv.org/',
+        'description': f"Recent papers from arXiv {', '.join(categories)}",
+        'language': 'en',
+    }
+    write_feed(ARXIV_COMBINED_OUTPUT, channel, entries, max_entries=ARXIV_MAX_ENTRIES)
+    print(f"✓ combined: {len(entries)} papers in {len(categories)} categories")
+
+    if archive.ARCHIVE and entries:
+        with metrics.stage('archive'):
+            try:
+                archived = archive.archive_entries(entries)
+            except sqlite3.Error as e:
+                print(f"✗ Could not archive entries: {e}")
+            else:
+                if archived:
+                    print(f"Archived {archived} new or changed entries")
+    return entries
+
+def generate_feed(source=None):
+    source = source or ARXIV_SOURCE
+    if source != 'categories' and source not in SOURCES:
+        raise ValueError(f"Unknown ARXIV_SOURCE {source!r}, expected one of: {', '.join([*SOURCES, 'categories'])}")
+    
+    try:
+        if source == 'categories':
+            generate_category_feeds()
+            return
+        SOURCES[source].generate()
         
     except Exception as e:
         print(f"Error generating arXiv cs.AI feed: {e}")
@@ -224,4 +468,3 @@ def generate_feed():
 
 if __name__ == "__main__":
     generate_feed()
-
@@ -2,115 +2,167 @@
 Utility functions for date parsing
 """
 
+from calendar import monthrange
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 import re
 
+from feed_generators import metrics
+
+MONTH_NAMES = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4,
+    'may': 5, 'june': 6, 'july': 7, 'august': 8,
+    'september': 9, 'october': 10, 'november': 11, 'december': 12
+}
+# Full names and three-letter abbreviations, as accepted by strptime's %B and %b
+MONTHS = dict(MONTH_NAMES, **{name[:3]: number for name, number in MONTH_NAMES.items()})
+
+# One pattern picks the format of a date string, so only a single parser runs per string
+DATE_FORMAT_RE = re.compile(r'''
+    ^(?:
+        (?P<iso>\d{4}.*)                                                    # ISO 8601 and YYYY-M-D variants
+      | (?P<month_day>(?P<md_month>[a-z]+)\s+(?P<md_day>\d{1,2}),\s+(?P<md_year>\d{4}))  # January 15, 2024
+      | (?P<day_month>(?P<dm_day>\d{1,2})\s+(?P<dm_month>[a-z]+)\s+(?P<dm_year>\d{4}))    # 15 January 2024
+      | (?P<slash>(?P<sl_first>\d{1,2})/(?P<sl_second>\d{1,2})/(?P<sl_year>\d{4}))         # 01/15/2024 or 15/01/2024
+    )$
+''', re.I | re.X)
+LOOSE_ISO_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})(?:(?:T|\s+)(\d{1,2}):(\d{1,2}):(\d{1,2})|T(\d{1,2}):(\d{1,2}):(\d{1,2})Z)?$')
+
+DATE_CLASS_RE = re.compile(r'date|time|published|timestamp|meta', re.I)
+PARENT_DATE_CLASS_RE = re.compile(r'date|time|published', re.I)
+URL_DATE_RE = re.compile(r'/(\d{4})/(\d{1,2})/')
+TEXT_DATE_RES = [
+    re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'),  # YYYY-MM-DD
+    re.compile(r'(\w+)\s+(\d{1,2}),\s+(\d{4})'),  # Month DD, YYYY
+    re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'),  # MM/DD/YYYY
+]
+
+# Date fragments that end up glued to titles on listing pages
+TITLE_CLEANUP_RES = [
+    # Remove date patterns at the beginning (e.g., "10 March 2025TITLE" or "10 March 2025 TITLE")
+    re.compile(r'^\d{1,2}\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}\s*', re.I),
+    re.compile(r'^\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\w*\s+\d{4}\s*', re.I),
+    # Remove date patterns at the end
+    re.compile(r'\s*\d{4}-\d{2}-\d{2}\s*$'),  # YYYY-MM-DD at end
+    re.compile(r'\s*\d{1,2}/\d{1,2}/\d{4}\s*$'),  # MM/DD/YYYY at end
+    re.compile(r'\s*\(\d{4}\)\s*$'),  # (YYYY) at end
+    re.compile(r'\s*-\s*\d{4}\s*$'),  # - YYYY at end
+]
+WHITESPACE_RE = re.compile(r'\s+')
+
+def _make_date(year, month, day, hour=0, minute=0, second=0):
+    """Build a naive datetime, or None if the fields are out of range"""
+    if year < 1 or not 1 <= month <= 12 or not 1 <= day <= monthrange(year, month)[1]:
+        return None
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    return datetime(year, month, day, hour, minute, second)
+
+@lru_cache(maxsize=4096)
+def _parse_date(date_str):
+    match = DATE_FORMAT_RE.match(date_str)
+    if not match:
+        return None
+
+    if match.group('iso'):
+        try:
+            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        except ValueError:
+            pass
+        # strptime-style variants with single-digit fields, e.g. 2024-1-5
+        loose = LOOSE_ISO_RE.match(date_str)
+        if not loose:
+            return None
+        return _make_date(*(int(group) for group in loose.groups() if group is not None))
+
+    if match.group('month_day'):
+        month = MONTHS.get(match.group('md_month').lower())
+        return month and _make_date(int(match.group('md_year')), month, int(match.group('md_day')))
+
+    if match.group('day_month'):
+        month = MONTHS.get(match.group('dm_month').lower())
+        return month and _make_date(int(match.group('dm_year')), month, int(match.group('dm_day')))
+
+    # MM/DD/YYYY first, then DD/MM/YYYY
+    first, second, year = int(match.group('sl_first')), int(match.group('sl_second')), int(match.group('sl_year'))
+    return _make_date(year, first, second) or _make_date(year, second, first)
+
 def parse_date_string(date_str):
     """Try to parse a date string in various formats"""
     if not date_str:
         return None
-    
-    date_str = str(date_str).strip()
-    
-    # Try ISO format
-    try:
-        return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-    except:
-        pass
-    
-    # Try common date formats
-    date_formats = [
-        '%Y-%m-%d',
-        '%Y-%m-%d %H:%M:%S',
-        '%Y-%m-%dT%H:%M:%S',
-        '%Y-%m-%dT%H:%M:%SZ',
-        '%B %d, %Y',  # January 15, 2024
-        '%b %d, %Y',  # Jan 15, 2024
-        '%d %B %Y',   # 15 January 2024
-        '%d %b %Y',   # 15 Jan 2024
-        '%m/%d/%Y',   # 01/15/2024
-        '%d/%m/%Y',   # 15/01/2024
-    ]
-    
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(date_str, fmt)
-        except:
-            continue
-    
-    return None
+    return _parse_date(str(date_str).strip())
+
+def clean_title(title):
+    """Remove dates glued to the start or end of a title and normalize whitespace"""
+    for pattern in TITLE_CLEANUP_RES:
+        title = pattern.sub('', title)
+    # Clean up extra spaces and separators
+    title = WHITESPACE_RE.sub(' ', title).strip()
+    return title.strip(' -–—')
 
 def extract_date_from_element(element, url=None):
     """Extract date from HTML element using multiple methods"""
+    with metrics.stage('dates'):
+        return _extract_date_from_element(element, url)
+
+def _extract_date_from_element(element, url):
     pub_date = None
-    
+
     # Method 1: Look for time/date elements with various class names
-    date_elem = element.find(['time', 'span', 'div', 'p'], class_=re.compile(r'date|time|published|timestamp|meta', re.I))
+    date_elem = element.find(['time', 'span', 'div', 'p'], class_=DATE_CLASS_RE)
     if date_elem:
         date_str = date_elem.get('datetime') or date_elem.get('title') or date_elem.get_text(strip=True)
         if date_str:
             pub_date = parse_date_string(date_str)
-    
+
     # Method 2: Look for date in parent or sibling elements
     if not pub_date:
         parent = element.parent if hasattr(element, 'parent') else None
         if parent:
-            date_elem = parent.find(['time', 'span', 'div'], class_=re.compile(r'date|time|published', re.I))
+            date_elem = parent.find(['time', 'span', 'div'], class_=PARENT_DATE_CLASS_RE)
             if date_elem:
                 date_str = date_elem.get('datetime') or date_elem.get_text(strip=True)
                 if date_str:
                     pub_date = parse_date_string(date_str)
-    
+
     # Method 3: Try to extract date from URL (e.g., /blog/2024/01/article)
     if not pub_date and url:
-        url_date_match = re.search(r'/(\d{4})/(\d{1,2})/', url)
+        url_date_match = URL_DATE_RE.search(url)
         if url_date_match:
             year, month = url_date_match.groups()
-            try:
-                pub_date = datetime(int(year), int(month), 1, tzinfo=timezone.utc)
-            except:
-                pass
-    
+            pub_date = _make_date(int(year), int(month), 1)
+            if pub_date:
+                pub_date = pub_date.replace(tzinfo=timezone.utc)
+
     # Method 4: Look for any text that looks like a date
     if not pub_date:
         element_text = element.get_text()
         # Look for patterns like "January 15, 2024" or "2024-01-15"
-        date_patterns = [
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
-            r'(\w+)\s+(\d{1,2}),\s+(\d{4})',  # Month DD, YYYY
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',  # MM/DD/YYYY
-        ]
-        for pattern in date_patterns:
-            match = re.search(pattern, element_text)
+        for pattern in TEXT_DATE_RES:
+            match = pattern.search(element_text)
             if match:
-                try:
-                    if '-' in match.group(0):
-                        year, month, day = match.groups()
-                        pub_date = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
-                    elif '/' in match.group(0):
-                        month, day, year = match.groups()
-                        pub_date = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
-                    else:
-                        # Month DD, YYYY format
-                        month_names = {
-                            'january': 1, 'february': 2, 'march': 3, 'april': 4,
-                            'may': 5, 'june': 6, 'july': 7, 'august': 8,
-                            'september': 9, 'october': 10, 'november': 11, 'december': 12
-                        }
-                        month_str, day, year = match.groups()
-                        month = month_names.get(month_str.lower(), 1)
-                        pub_date = datetime(int(year), month, int(day), tzinfo=timezone.utc)
+                if '-' in match.group(0):
+                    year, month, day = match.groups()
+                    month = int(month)
+                elif '/' in match.group(0):
+                    month, day, year = match.groups()
+                    month = int(month)
+                else:
+                    # Month DD, YYYY format
+                    month_str, day, year = match.groups()
+                    month = MONTH_NAMES.get(month_str.lower(), 1)
+                pub_date = _make_date(int(year), month, int(day))
+                if pub_date:
+                    pub_date = pub_date.replace(tzinfo=timezone.utc)
                     break
-                except:
-                    continue
-    
+
     # Ensure timezone is set
     if pub_date and pub_date.tzinfo is None:
         pub_date = pub_date.replace(tzinfo=timezone.utc)
-    
+
     return pub_date
 
 def get_fallback_date(offset_hours=0):
     """Get a fallback date with optional offset for ordering"""
     return datetime.now(timezone.utc) - timedelta(hours=offset_hours)
-
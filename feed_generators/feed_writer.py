@@ -0,0 +1,659 @@
+"""
+Writing RSS, Atom and JSON feeds, optionally merging new entries into the existing feed file
+
+Feeds are serialized entry by entry straight to temporary files, one per selected format, which
+are then renamed over the feeds. RSS and Atom output is byte for byte what feedgen produces for
+the same channel and entries; build_feed() builds the equivalent FeedGenerator for comparison.
+Optionally each feed is also split into pages linked as an RFC 5005 paged feed, and every file
+gets gzip and brotli compressed copies next to it.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+# Only the version: feedgen itself (and lxml) is loaded by build_feed(), for comparisons
+from feedgen.version import version_str as FEEDGEN_VERSION
+
+from feed_generators import metrics
+from feed_generators.http_cache import CACHE_DIR
+from feed_generators.items import FeedItem
+from feed_generators.store import write_atomic
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Incremental mode keeps entries from previous runs that are no longer on the source page
+INCREMENTAL = os.environ.get('FEED_INCREMENTAL', '0') == '1'
+MAX_ENTRIES = int(os.environ.get('FEED_MAX_ENTRIES', '0'))  # 0 keeps the generator's own limit
+MAX_AGE_DAYS = float(os.environ.get('FEED_MAX_AGE_DAYS', '0'))  # 0 disables age-based eviction
+
+# Formats written next to each other: feed_x.xml (RSS 2.0), feed_x.atom and feed_x.json (JSON Feed 1.1)
+DEFAULT_FORMATS = 'rss'
+
+# Links between pages are relative to the directory of the feeds unless a base URL is given
+PAGE_BASE_URL = os.environ.get('FEED_PAGE_BASE_URL', '')
+PAGE_NAME_RE = re.compile(r'_page(\d+)\.')
+
+# Compressed copies written next to each feed file: feed_x.xml.gz, feed_x.xml.br
+COMPRESSIONS = ('gz', 'br')
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+LAST_BUILD_DATE_RE = re.compile(rb'<lastBuildDate>[^<]*</lastBuildDate>')
+ATOM_UPDATED_RE = re.compile(rb'<updated>[^<]*</updated>')
+
+# Channel elements feedgen always writes
+XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8'?>\n"
+RSS_DOCS = 'http://www.rssboard.org/rss-specification'
+GENERATOR = 'python-feedgen'
+GENERATOR_URI = 'https://lkiesow.github.io/python-feedgen'
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+JSON_FEED_VERSION = 'https://jsonfeed.org/version/1.1'
+
+# Characters lxml refuses to serialize
+INVALID_XML_CHARS_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# English names regardless of the locale, as feedgen's formatRFC2822() does by switching to C
+DAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+COMPARE_BLOCK_SIZE = 1 << 16
+
+# Fingerprints of the entries last written to each feed, to skip serializing unchanged feeds
+FINGERPRINT_DIR = Path(CACHE_DIR) / 'fingerprints'
+
+def load_rss_entries(path):
+    """Read the entries of an existing RSS file, in file order"""
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return []
+
+    entries = []
+    for item in root.iter('item'):
+        pub_date = None
+        if item.findtext('pubDate'):
+            try:
+                pub_date = parsedate_to_datetime(item.findtext('pubDate'))
+            except (TypeError, ValueError):
+                pass
+        entries.append(FeedItem(
+            item.findtext('link') or '',
+            title=item.findtext('title') or '',
+            summary=item.findtext('description') or '',
+            published=pub_date,
+            guid=item.findtext('guid') or None,
+        ))
+    return entries
+
+def _parse_iso_date(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+def load_atom_entries(path):
+    """Read the entries of an existing Atom file, in file order"""
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return []
+
+    entries = []
+    for item in root.iter(f'{ATOM_NS}entry'):
+        link = item.find(f'{ATOM_NS}link')
+        url = link.get('href', '') if link is not None else ''
+        entry_id = item.findtext(f'{ATOM_NS}id')
+        entries.append(FeedItem(
+            url,
+            title=item.findtext(f'{ATOM_NS}title') or '',
+            summary=item.findtext(f'{ATOM_NS}content') or '',
+            published=_parse_iso_date(item.findtext(f'{ATOM_NS}published')),
+            guid=entry_id if entry_id not in (None, url) else None,
+        ))
+    return entries
+
+def load_json_entries(path):
+    """Read the items of an existing JSON Feed file, in file order"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            items = json.load(f)['items']
+    except (OSError, ValueError, KeyError, TypeError):
+        return []
+
+    entries = []
+    for item in items:
+        url = item.get('url', '')
+        entries.append(FeedItem(
+            url,
+            title=item.get('title', ''),
+            summary=item.get('content_text', ''),
+            published=_parse_iso_date(item.get('date_published')),
+            guid=item['id'] if item.get('id') not in (None, url) else None,
+            authors=[author['name'] for author in item.get('authors', []) if author.get('name')],
+            categories=item.get('tags', []),
+        ))
+    return entries
+
+def load_entries(path):
+    """Read the entries of an existing feed file in whichever format its suffix says, in file order"""
+    for feed_format in FORMATS.values():
+        if str(path).endswith(feed_format.suffix):
+            return feed_format.load(path)
+    return load_rss_entries(path)
+
+def selected_formats():
+    """Formats to write, from FEED_FORMATS (comma-separated, e.g. rss,atom,json)"""
+    names = [name.strip() for name in os.environ.get('FEED_FORMATS', DEFAULT_FORMATS).split(',') if name.strip()]
+    unknown = [name for name in names if name not in FORMATS]
+    if unknown or not names:
+        raise ValueError(f"Unknown feed format in FEED_FORMATS: {', '.join(unknown) or '(none)'}, expected some of: {', '.join(FORMATS)}")
+    return list(dict.fromkeys(names))
+
+def selected_compressions():
+    """Compressed copies to write next to each feed file, from FEED_COMPRESS (comma-separated: gz, br)"""
+    names = [name.strip() for name in os.environ.get('FEED_COMPRESS', '').split(',') if name.strip()]
+    unknown = [name for name in names if name not in COMPRESSIONS]
+    if unknown:
+        raise ValueError(f"Unknown compression in FEED_COMPRESS: {', '.join(unknown)}, expected some of: {', '.join(COMPRESSIONS)}")
+    if 'br' in names and brotli is None:
+        raise ValueError("FEED_COMPRESS=br requires the brotli package")
+    return list(dict.fromkeys(names))
+
+def selected_page_size():
+    """Entries per page of the paged copy of each feed, from FEED_PAGE_SIZE; 0 writes no pages"""
+    value = os.environ.get('FEED_PAGE_SIZE', '0')
+    try:
+        page_size = int(value)
+    except ValueError:
+        page_size = -1
+    if page_size < 0:
+        raise ValueError(f"FEED_PAGE_SIZE must be a number of entries, got {value!r}")
+    return page_size
+
+def _feed_stem(path):
+    suffix = FORMATS['rss'].suffix
+    return path.name[:-len(suffix)] if path.name.endswith(suffix) else path.name
+
+def output_paths(path, formats=None):
+    """Path of the feed in each format: the RSS path with the suffix of the format"""
+    path = Path(path)
+    stem = _feed_stem(path)
+    return {name: path.with_name(stem + FORMATS[name].suffix) for name in formats or selected_formats()}
+
+def page_path(path, number):
+    """RSS path of a page of the paged feed: feed_x_latest.xml for the newest entries, then feed_x_page2.xml, ..."""
+    path = Path(path)
+    page = 'latest' if number == 1 else f'page{number}'
+    return path.with_name(f"{_feed_stem(path)}_{page}{FORMATS['rss'].suffix}")
+
+def page_links(path, feed_format, number, count):
+    """RFC 5005 links of a page to the first, last, previous and next pages, in the page's format"""
+    def href(page_number):
+        return PAGE_BASE_URL + output_paths(page_path(path, page_number), [feed_format])[feed_format].name
+
+    links = [('first', href(1)), ('last', href(count))]
+    if number > 1:
+        links.append(('previous', href(number - 1)))
+    if number < count:
+        links.append(('next', href(number + 1)))
+    return links
+
+def stale_pages(path, count):
+    """Files of pages after the last one, left over from runs with more entries"""
+    path = Path(path)
+    stem = _feed_stem(path)
+    stale = []
+    for page_file in path.parent.glob(f"{stem}_page*"):
+        match = PAGE_NAME_RE.match(page_file.name[len(stem):])
+        if match and int(match.group(1)) > count:
+            stale.append(page_file)
+    return stale
+
+def compress(data, compression):
+    """Compress bytes for a compressed copy: 'gz' without a timestamp, so unchanged feeds give identical files, or 'br'"""
+    if compression == 'gz':
+        return gzip.compress(data, GZIP_LEVEL, mtime=0)
+    if brotli is None:
+        raise ImportError("brotli compression requires the brotli package")
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+def compressed_path(path, compression):
+    return path.with_name(f"{path.name}.{compression}")
+
+def write_compressed(path, compression):
+    """Write the compressed copy of a feed file next to it"""
+    write_atomic(compressed_path(path, compression), compress(path.read_bytes(), compression))
+
+def load_feed_entries(path, formats=None):
+    """Read the entries of a feed from the first selected format that has been written"""
+    for name, format_path in output_paths(path, formats).items():
+        if format_path.exists():
+            return FORMATS[name].load(format_path)
+    return []
+
+def merge_entries(entries, existing, max_entries=None, max_age_days=None):
+    """Merge new entries over existing ones by GUID, newest first, evicting old and surplus entries"""
+    merged = {entry.key: entry for entry in existing}
+    for entry in entries:
+        merged[entry.key] = entry
+
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    result = sorted(merged.values(), key=lambda entry: entry.published or oldest, reverse=True)
+    if max_age_days:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        result = [entry for entry in result if entry.published and entry.published >= cutoff]
+    if max_entries:
+        result = result[:max_entries]
+    return result
+
+def build_feed(channel, entries, order='prepend'):
+    """Build a FeedGenerator from channel metadata and feed items; rss_str() matches iter_rss()"""
+    from feedgen.feed import FeedGenerator
+
+    fg = FeedGenerator()
+    fg.title(channel['title'])
+    fg.link(href=channel['link'], rel='alternate')
+    fg.description(channel['description'])
+    fg.language(channel.get('language', 'en'))
+
+    for entry in entries:
+        fe = fg.add_entry(order=order)
+        fe.title(entry.title)
+        fe.link(href=entry.url)
+        fe.description(entry.summary)
+        fe.pubDate(entry.published)
+        if entry.guid:
+            fe.guid(entry.guid, permalink=True)
+    return fg
+
+def escape_text(value):
+    """Escape element text the way lxml serializes it"""
+    if INVALID_XML_CHARS_RE.search(value):
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+    if '&' in value:
+        value = value.replace('&', '&amp;')
+    if '<' in value:
+        value = value.replace('<', '&lt;')
+    if '>' in value:
+        value = value.replace('>', '&gt;')
+    if '\r' in value:
+        value = value.replace('\r', '&#13;')
+    return value
+
+def escape_attribute(value):
+    """Escape an attribute value the way lxml serializes it"""
+    value = escape_text(value).replace('"', '&quot;')
+    return value.replace('\t', '&#9;').replace('\n', '&#10;')
+
+def format_rfc2822(date):
+    """RFC 2822 date as written by feedgen"""
+    if date.tzinfo is None:
+        raise ValueError('Datetime object has no timezone info')
+    return date.strftime(f'{DAY_NAMES[date.weekday()]}, %d {MONTH_NAMES[date.month - 1]} %Y %H:%M:%S %z')
+
+def _check_channel(channel):
+    missing = [field for field in ('title', 'link', 'description') if not channel.get(field)]
+    if missing:
+        raise ValueError(f"Required fields not set ({', '.join(missing)})")
+
+def rss_header(channel, build_date):
+    _check_channel(channel)
+    header = [
+        XML_DECLARATION,
+        '<rss xmlns:atom="http://www.w3.org/2005/Atom" xmlns:content="http://purl.org/rss/1.0/modules/content/" version="2.0">',
+        f"<channel><title>{escape_text(channel['title'])}</title>",
+        f"<link>{escape_text(channel['link'])}</link>",
+        f"<description>{escape_text(channel['description'])}</description>",
+        f"<docs>{RSS_DOCS}</docs><generator>{GENERATOR}</generator>",
+    ]
+    language = channel.get('language', 'en')
+    if language:
+        header.append(f"<language>{escape_text(language)}</language>")
+    header.append(f"<lastBuildDate>{format_rfc2822(build_date)}</lastBuildDate>")
+    for rel, href in channel.get('links', ()):
+        header.append(f'<atom:link href="{escape_attribute(href)}" rel="{rel}"/>')
+    return ''.join(header)
+
+def rss_item(entry, build_date):
+    title, link, description = entry.title, entry.url, entry.summary
+    if not (title or description):
+        raise ValueError('Required fields not set')
+    item = ['<item>']
+    if title:
+        item.append(f"<title>{escape_text(title)}</title>")
+    if link:
+        item.append(f"<link>{escape_text(link)}</link>")
+    if description:
+        item.append(f"<description>{escape_text(description)}</description>")
+    if entry.guid:
+        item.append(f"<guid isPermaLink=\"true\">{escape_text(entry.guid)}</guid>")
+    if entry.published:
+        item.append(f"<pubDate>{format_rfc2822(entry.published)}</pubDate>")
+    item.append('</item>')
+    return ''.join(item)
+
+def atom_header(channel, build_date):
+    """The feed ID is the channel link"""
+    _check_channel(channel)
+    language = channel.get('language', 'en')
+    links = ''.join(f'<link href="{escape_attribute(href)}" rel="{rel}"/>' for rel, href in channel.get('links', ()))
+    return ''.join([
+        XML_DECLARATION,
+        '<feed xmlns="http://www.w3.org/2005/Atom"',
+        f' xml:lang="{escape_attribute(language)}">' if language else '>',
+        f"<id>{escape_text(channel['link'])}</id>",
+        f"<title>{escape_text(channel['title'])}</title>",
+        f"<updated>{build_date.isoformat()}</updated>",
+        f'<link href="{escape_attribute(channel["link"])}" rel="alternate"/>',
+        links,
+        f'<generator uri="{GENERATOR_URI}" version="{FEEDGEN_VERSION}">{GENERATOR}</generator>',
+        f"<subtitle>{escape_text(channel['description'])}</subtitle>",
+    ])
+
+def atom_item(entry, build_date):
+    """An entry's ID is its GUID or link; it was updated when published, or at build time if it has no date"""
+    if not entry.title:
+        raise ValueError('Required fields not set')
+    pub_date = entry.published
+    updated = pub_date or build_date
+    if updated.tzinfo is None:
+        raise ValueError('Datetime object has no timezone info')
+    item = [
+        f"<entry><id>{escape_text(entry.key)}</id>",
+        f"<title>{escape_text(entry.title)}</title>",
+        f"<updated>{updated.isoformat()}</updated>",
+    ]
+    if entry.summary:
+        item.append(f"<content>{escape_text(entry.summary)}</content>")
+    # feedgen drops the rel of entry links; alternate is the default anyway
+    item.append(f'<link href="{escape_attribute(entry.url)}"/>')
+    if pub_date:
+        item.append(f"<published>{pub_date.isoformat()}</published>")
+    item.append('</entry>')
+    return ''.join(item)
+
+def json_header(channel, build_date):
+    """JSON Feed top-level object up to the opening of its items array"""
+    _check_channel(channel)
+    feed = {
+        'version': JSON_FEED_VERSION,
+        'title': channel['title'],
+        'home_page_url': channel['link'],
+        'description': channel['description'],
+    }
+    if channel.get('language', 'en'):
+        feed['language'] = channel.get('language', 'en')
+    # JSON Feed pages only link forward
+    for rel, href in channel.get('links', ()):
+        if rel == 'next':
+            feed['next_url'] = href
+    # Leave the object open for the items, which are written one by one
+    return json.dumps(feed, ensure_ascii=False)[:-1] + ', "items": [\n'
+
+def json_item(entry, build_date):
+    item = {'id': entry.key, 'url': entry.url}
+    if entry.title:
+        item['title'] = entry.title
+    item['content_text'] = entry.summary
+    if entry.published:
+        if entry.published.tzinfo is None:
+            raise ValueError('Datetime object has no timezone info')
+        item['date_published'] = entry.published.isoformat()
+    if entry.authors:
+        item['authors'] = [{'name': name} for name in entry.authors]
+    if entry.categories:
+        item['tags'] = list(entry.categories)
+    return json.dumps(item, ensure_ascii=False)
+
+class FeedFormat:
+    """How a feed format is serialized: a header, a chunk of text per entry and a footer"""
+
+    def __init__(self, name, suffix, header, item, footer, load, separator='', build_date_re=None):
+        self.name = name
+        self.suffix = suffix
+        self.header = header
+        self.item = item
+        self.footer = footer
+        self.load = load
+        self.separator = separator  # between entries
+        self.build_date_re = build_date_re  # ignored when deciding whether the feed changed
+
+    def __repr__(self):
+        return f"FeedFormat({self.name!r})"
+
+FORMATS = {
+    'rss': FeedFormat('rss', '.xml', rss_header, rss_item, '</channel></rss>', load_rss_entries,
+                      build_date_re=LAST_BUILD_DATE_RE),
+    'atom': FeedFormat('atom', '.atom', atom_header, atom_item, '</feed>', load_atom_entries,
+                       build_date_re=ATOM_UPDATED_RE),
+    # No build date in JSON Feed: the file only changes with its items
+    'json': FeedFormat('json', '.json', json_header, json_item, '\n]}\n', load_json_entries, separator=',\n'),
+}
+
+def iter_feed(feed_format, channel, entries, build_date=None):
+    """Serialize a feed in chunks of text, one per entry, in the given entry order"""
+    build_date = build_date or datetime.now(timezone.utc)
+    yield feed_format.header(channel, build_date)
+    for index, entry in enumerate(entries):
+        item = feed_format.item(entry, build_date)
+        yield feed_format.separator + item if index else item
+    yield feed_format.footer
+
+def iter_rss(channel, entries, build_date=None):
+    return iter_feed(FORMATS['rss'], channel, entries, build_date)
+
+def iter_atom(channel, entries, build_date=None):
+    return iter_feed(FORMATS['atom'], channel, entries, build_date)
+
+def iter_json(channel, entries, build_date=None):
+    return iter_feed(FORMATS['json'], channel, entries, build_date)
+
+def stream_feed(path, chunks):
+    """Write text chunks to a temporary file next to path and return the temporary path"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+def stream_feeds(paths, channel, entries, build_date=None):
+    """Write a feed in several formats in one pass over the entries.
+
+    paths maps format names to feed paths; returns the temporary path written for each format.
+    """
+    build_date = build_date or datetime.now(timezone.utc)
+    tmp_paths = {name: path.with_name(path.name + '.tmp') for name, path in paths.items()}
+    try:
+        with ExitStack() as stack:
+            outputs = []
+            for name, tmp_path in tmp_paths.items():
+                f = stack.enter_context(open(tmp_path, 'w', encoding='utf-8', newline=''))
+                f.write(FORMATS[name].header(channel, build_date))
+                outputs.append((FORMATS[name], f))
+
+            for index, entry in enumerate(entries):
+                for feed_format, f in outputs:
+                    item = feed_format.item(entry, build_date)
+                    f.write(feed_format.separator + item if index else item)
+
+            for feed_format, f in outputs:
+                f.write(feed_format.footer)
+    except BaseException:
+        for tmp_path in tmp_paths.values():
+            tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_paths
+
+def same_feed(path, other_path, build_date_re=LAST_BUILD_DATE_RE):
+    """Whether two feed files differ at most in their build date, compared block by block"""
+    try:
+        f, other = open(path, 'rb'), open(other_path, 'rb')
+    except OSError:
+        return False
+    with f, other:
+        head, other_head = f.read(COMPARE_BLOCK_SIZE), other.read(COMPARE_BLOCK_SIZE)
+        if build_date_re is None:
+            rest, other_rest = head, other_head
+        else:
+            match, other_match = build_date_re.search(head), build_date_re.search(other_head)
+            if not (match and other_match):
+                return build_date_re.sub(b'', head + f.read()) == build_date_re.sub(b'', other_head + other.read())
+            if head[:match.start()] != other_head[:other_match.start()]:
+                return False
+
+            # The build date is in the channel header, the rest of both files has to be identical
+            rest, other_rest = head[match.end():], other_head[other_match.end():]
+        while True:
+            if len(rest) < COMPARE_BLOCK_SIZE:
+                rest += f.read(COMPARE_BLOCK_SIZE)
+            if len(other_rest) < COMPARE_BLOCK_SIZE:
+                other_rest += other.read(COMPARE_BLOCK_SIZE)
+            size = min(len(rest), len(other_rest))
+            if not size:
+                return not rest and not other_rest
+            if rest[:size] != other_rest[:size]:
+                return False
+            rest, other_rest = rest[size:], other_rest[size:]
+
+def feed_fingerprint(channel, entries, settings=()):
+    """SHA-256 of the channel, the output settings and the normalized entries, in output order"""
+    header = [FEEDGEN_VERSION, channel, *settings]
+    digest = hashlib.sha256(json.dumps(header, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+    for entry in entries:
+        digest.update(json.dumps(entry.as_row(), ensure_ascii=False).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+def _fingerprint_path(path):
+    return FINGERPRINT_DIR / f"{path.name}.json"
+
+def fingerprint_matches(path, fingerprint, files):
+    """Whether the feed files were last written from entries with this fingerprint and are still as written"""
+    try:
+        record = json.loads(_fingerprint_path(path).read_text(encoding='utf-8'))
+        sizes = {file.name: file.stat().st_size for file in files}
+    except (OSError, ValueError):
+        return False
+    return (record.get('path') == str(path.resolve()) and record.get('fingerprint') == fingerprint
+            and record.get('sizes') == sizes)
+
+def save_fingerprint(path, fingerprint, files):
+    record = {
+        'path': str(path.resolve()),
+        'fingerprint': fingerprint,
+        'sizes': {file.name: file.stat().st_size for file in files},
+    }
+    write_atomic(_fingerprint_path(path), json.dumps(record))
+
+def replace_feed(tmp_path, path, feed_format, compressions=()):
+    """Rename a freshly written file over the feed unless only its build date differs; returns True if replaced.
+
+    The compressed copies are rewritten whenever the feed is, and written if they are missing.
+    """
+    changed = not same_feed(tmp_path, path, feed_format.build_date_re)
+    if changed:
+        os.replace(tmp_path, path)
+    else:
+        tmp_path.unlink()
+    for compression in compressions:
+        if changed or not compressed_path(path, compression).exists():
+            write_compressed(path, compression)
+    return changed
+
+# How write_feed() is given its entries: 'page' is the order of the source page, newest first, and
+# is written in reverse like feedgen's default; 'newest' is newest first and written as given
+ORDERS = ('page', 'newest')
+
+def write_feed(path, channel, entries, incremental=None, max_entries=None, max_age_days=None, count=True, order='page'):
+    """Write entries to the feed in every selected format, skipping files where nothing but the build date would change.
+
+    path is the RSS path; the other formats are written next to it (see output_paths()). Entries
+    are given in `order` (see ORDERS): in page order they are, like feedgen's default, written in
+    reverse. In incremental mode they are merged with the entries already in the feed and written
+    newest first. When the
+    entries have the same fingerprint as on the previous run, nothing is serialized at all.
+    With FEED_PAGE_SIZE the entries are also written in pages of that size (see page_path()),
+    and with FEED_COMPRESS every file gets compressed copies. Sub-feeds pass count=False so their
+    entries are not counted as the generator's. Returns True if any file was written.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"Unknown entry order {order!r}, expected one of: {', '.join(ORDERS)}")
+    with metrics.stage('write'):
+        return _write_feed(Path(path), channel, entries, incremental, max_entries, max_age_days, count, order)
+
+def _write_feed(path, channel, entries, incremental, max_entries, max_age_days, count=True, order='page'):
+    incremental = INCREMENTAL if incremental is None else incremental
+    max_entries = MAX_ENTRIES or max_entries
+    max_age_days = max_age_days or MAX_AGE_DAYS
+
+    paths = output_paths(path)
+    compressions = selected_compressions()
+    page_size = selected_page_size()
+
+    if incremental:
+        entries = merge_entries(entries, load_feed_entries(path), max_entries, max_age_days)
+    # Entries are now newest first; only page order is written in reverse, like feedgen's add_entry()
+    reverse = not incremental and order == 'page'
+    ordered = entries[::-1] if reverse else entries
+    if count:
+        metrics.count('entries', len(entries))
+
+    pages = []
+    if page_size:
+        # Pages are cut from the entries newest first, so the latest page has the newest ones;
+        # each page is written in the same order as the whole feed.
+        # The latest page is written even when there are no entries, so it always exists
+        pages = [entries[start:start + page_size] for start in range(0, len(entries), page_size)] or [[]]
+        if reverse:
+            pages = [page[::-1] for page in pages]
+    page_paths = [output_paths(page_path(path, number), list(paths)) for number in range(1, len(pages) + 1)]
+    files = [*paths.values(), *(page_file for page in page_paths for page_file in page.values())]
+    files += [compressed_path(file, compression) for file in files for compression in compressions]
+
+    fingerprint = feed_fingerprint(channel, ordered, [page_size, compressions])
+    if fingerprint_matches(path, fingerprint, files):
+        print(f"{path.name} unchanged ({len(entries)} entries, same fingerprint), not rewritten")
+        return False
+
+    build_date = datetime.now(timezone.utc)
+    written = False
+    for name, tmp_path in stream_feeds(paths, channel, ordered, build_date).items():
+        if not replace_feed(tmp_path, paths[name], FORMATS[name], compressions):
+            print(f"{paths[name].name} unchanged ({len(entries)} entries), not rewritten")
+            continue
+        print(f"Generated {paths[name].name} with {len(entries)} entries")
+        written = True
+
+    if pages:
+        pages_written = 0
+        for number, (page, page_files) in enumerate(zip(pages, page_paths), 1):
+            for name, page_file in page_files.items():
+                page_channel = dict(channel, links=page_links(path, name, number, len(pages)))
+                tmp_path = stream_feed(page_file, iter_feed(FORMATS[name], page_channel, page, build_date))
+                pages_written += replace_feed(tmp_path, page_file, FORMATS[name], compressions)
+        for stale_file in stale_pages(path, len(pages)):
+            stale_file.unlink()
+        if pages_written:
+            print(f"Generated {pages_written} of {len(pages) * len(paths)} page files of {path.name}, "
+                  f"{page_size} entries per page")
+            written = True
+    save_fingerprint(path, fingerprint, files)
+    return written
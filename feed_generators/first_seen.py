@@ -0,0 +1,88 @@
+"""
+Persistent JSON store of the dates given to entries that have no publish date of their own
+"""
+
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from feed_generators.http_cache import CACHE_DIR
+from feed_generators.store import JsonStore
+
+# Stable dates keep undated entries at the date they got on their first run, so unchanged
+# pages give byte-identical feeds; 0 dates them relative to the current run, as before
+STABLE_DATES = os.environ.get('FEED_STABLE_DATES', '1') == '1'
+FIRST_SEEN_DAYS = float(os.environ.get('FEED_FIRST_SEEN_DAYS', '30'))  # forget entries not seen for this long
+
+class FirstSeenStore(JsonStore):
+    """Remember the fallback date an entry got when it was first seen, keyed by GUID or link.
+
+    Reusing that date on later runs keeps the feed output stable instead of moving every
+    undated entry to "now". Entries not seen for `max_age` seconds are dropped on save.
+    """
+
+    def __init__(self, path, max_age=None):
+        super().__init__(path)
+        self.max_age = max_age
+
+    def get(self, key):
+        """Return the date stored for an entry, or None"""
+        record = self.records.get(key)
+        if not record:
+            return None
+        try:
+            return datetime.fromisoformat(record['date'])
+        except (KeyError, ValueError):
+            return None
+
+    def put(self, key, date):
+        """Store the date of an entry and mark it as seen now"""
+        now = time.time()
+        record = self.records.get(key)
+        if record and record.get('date') == date.isoformat():
+            # Refresh the seen time now and then, not on every run
+            if not self.max_age or now - record.get('seen_at', 0) < self.max_age / 2:
+                return
+        self.records[key] = {'date': date.isoformat(), 'seen_at': now}
+        self.dirty = True
+
+    def save(self):
+        """Drop entries not seen for max_age and write the store back to disk if anything changed"""
+        if self.max_age:
+            cutoff = time.time() - self.max_age
+            expired = [key for key, record in self.records.items() if record.get('seen_at', 0) < cutoff]
+            for key in expired:
+                del self.records[key]
+            self.dirty = self.dirty or bool(expired)
+        super().save()
+
+def first_seen_path(name):
+    return Path(CACHE_DIR) / f"first_seen_{name}.json"
+
+def assign_fallback_dates(entries, fallback_date, name, previous_entries=None):
+    """Date the undated entries: `fallback_date(index)` the first time an entry is seen, the same date afterwards.
+
+    Entries missing from the store (a lost cache, or the first run with stable dates) keep the
+    date they have in `previous_entries()`, the entries of the feed already written, if any.
+    """
+    undated = [(index, entry) for index, entry in enumerate(entries) if not entry.published]
+    if not undated:
+        return
+    if not STABLE_DATES:
+        for index, entry in undated:
+            entry.published = fallback_date(index)
+        return
+
+    store = FirstSeenStore(first_seen_path(name), max_age=FIRST_SEEN_DAYS * 86400)
+    previous = None
+    for index, entry in undated:
+        date = store.get(entry.key)
+        if date is None:
+            if previous is None:
+                previous = {item.key: item.published for item in (previous_entries() if previous_entries else [])}
+            # Whole seconds, as RSS keeps them, so a date read back from the feed is the same date
+            date = previous.get(entry.key) or fallback_date(index).replace(microsecond=0)
+        store.put(entry.key, date)
+        entry.published = date
+    store.save()
@@ -0,0 +1,49 @@
+"""
+Utility functions for HTML parsing
+"""
+
+import os
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from feed_generators import metrics
+
+# BeautifulSoup tree builders in order of preference, fastest first; html5lib is left out, it is the slowest
+PARSER_BACKENDS = ('lxml', 'html.parser')
+
+_parser = None
+
+def available_parsers():
+    """Return the parser backends that are installed"""
+    parsers = []
+    for name in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('', name)
+        except FeatureNotFound:
+            continue
+        parsers.append(name)
+    return parsers
+
+def set_parser(name):
+    """Select the parser backend used by make_soup(), or None to restore the default"""
+    global _parser
+    if name and name not in available_parsers():
+        raise ValueError(f"HTML parser '{name}' is not available (installed: {', '.join(available_parsers())})")
+    _parser = name
+
+def get_parser():
+    """Return the selected parser: set_parser(), then FEED_HTML_PARSER, then lxml falling back to html.parser"""
+    global _parser
+    if _parser:
+        return _parser
+    name = os.environ.get('FEED_HTML_PARSER')
+    if name:
+        set_parser(name)
+    else:
+        _parser = 'lxml' if 'lxml' in available_parsers() else 'html.parser'
+    return _parser
+
+def make_soup(content, parse_only=None):
+    """Parse an HTML document with the selected backend, optionally keeping only tags matched by a SoupStrainer"""
+    with metrics.stage('parse'):
+        return BeautifulSoup(content, get_parser(), parse_only=parse_only)
@@ -0,0 +1,136 @@
+"""
+On-disk HTTP cache keyed by URL, storing response bodies with their ETag / Last-Modified validators
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from feed_generators.store import write_atomic
+
+CACHE_DIR = os.environ.get('FEED_CACHE_DIR', '.feed_cache')
+HTTP_CACHE_TTL = float(os.environ.get('FEED_HTTP_CACHE_TTL', str(7 * 24 * 3600)))  # seconds
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('FEED_HTTP_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+class HTTPCache:
+    """Store response bodies on disk and hand out conditional request headers for them.
+
+    Entries that have not been validated by the server for `ttl` seconds are dropped,
+    and the least recently used entries are evicted once the bodies exceed `max_bytes`.
+    """
+
+    def __init__(self, directory, ttl=HTTP_CACHE_TTL, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def _remove(self, meta_path, body_path):
+        for path in (meta_path, body_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def lookup(self, url):
+        """Return (meta, body) for a cached url, or None if missing or expired"""
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        if self.ttl and time.time() - meta.get('validated_at', 0) > self.ttl:
+            with self.lock:
+                self._remove(meta_path, body_path)
+            return None
+        return meta, body
+
+    def conditional_headers(self, meta):
+        """Build If-None-Match / If-Modified-Since headers from cached validators"""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url, response):
+        """Cache a 200 response if the server sent validators for it"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        now = time.time()
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': now,
+            'validated_at': now,
+            'size': len(response.content),
+        }
+        meta_path, body_path = self._paths(url)
+        with self.lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_atomic(body_path, response.content)
+            write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            self._evict()
+
+    def refresh(self, url, meta):
+        """Mark a cached entry as validated after a 304 Not Modified response"""
+        meta = dict(meta, validated_at=time.time())
+        meta_path, _ = self._paths(url)
+        with self.lock:
+            try:
+                write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop expired entries, then the least recently validated ones until under max_bytes"""
+        entries = []
+        now = time.time()
+        for meta_path in self.directory.glob('*.json'):
+            body_path = meta_path.with_suffix('.body')
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self._remove(meta_path, body_path)
+                continue
+            validated_at = meta.get('validated_at', 0)
+            if self.ttl and now - validated_at > self.ttl:
+                self._remove(meta_path, body_path)
+                continue
+            entries.append((validated_at, meta.get('size', 0), meta_path, body_path))
+
+        total = sum(size for _, size, _, _ in entries)
+        if not self.max_bytes or total <= self.max_bytes:
+            return
+        for _, size, meta_path, body_path in sorted(entries):
+            self._remove(meta_path, body_path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the shared HTTP cache, or None if disabled with FEED_HTTP_CACHE=0"""
+    global _default_cache
+    if os.environ.get('FEED_HTTP_CACHE', '1') == '0':
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache(Path(CACHE_DIR) / 'http')
+        return _default_cache
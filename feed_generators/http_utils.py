@@ -0,0 +1,176 @@
+"""
+Utility functions for HTTP fetching
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from feed_generators import metrics
+from feed_generators.http_cache import get_cache
+
+# urllib3 decodes brotli responses only when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+HTTP_TIMEOUT = float(os.environ.get('FEED_HTTP_TIMEOUT', '30'))  # seconds
+HTTP_RETRIES = int(os.environ.get('FEED_HTTP_RETRIES', '3'))
+HTTP_BACKOFF = float(os.environ.get('FEED_HTTP_BACKOFF', '0.5'))  # 0.5s, 1s, 2s, ...
+HTTP_POOL_SIZE = int(os.environ.get('FEED_HTTP_POOL_SIZE', '10'))  # keep-alive connections per host
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default timeout to every request"""
+
+    def __init__(self, timeout=HTTP_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().request(method, url, **kwargs)
+
+def create_session(timeout=HTTP_TIMEOUT, retries=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF,
+                   pool_size=HTTP_POOL_SIZE):
+    """Create a session with per-host connection pooling, retries with exponential backoff and a default timeout"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = TimeoutSession(timeout)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(HEADERS)
+    return session
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the session shared by all generators in this process"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+def wire_size(response):
+    """Bytes of a response body as received, before its Content-Encoding is decoded.
+
+    urllib3 does not count the bytes of chunked bodies, so those count their decoded size.
+    """
+    try:
+        size = response.raw.tell()
+    except (AttributeError, OSError, ValueError):
+        size = 0
+    if size:
+        return size
+    length = response.headers.get('Content-Length', '')
+    return int(length) if length.isdigit() else len(response.content)
+
+def fetch(url, timeout=None, headers=None):
+    """Download a url and return its body, revalidating a cached copy with a conditional request.
+
+    Raises requests.HTTPError on error status codes.
+    """
+    with metrics.stage('fetch'):
+        request_headers = dict(headers or {})
+        cache = get_cache()
+        cached = cache.lookup(url) if cache else None
+        if cached:
+            request_headers.update(cache.conditional_headers(cached[0]))
+
+        response = get_session().get(url, headers=request_headers, timeout=timeout)
+        metrics.count('requests')
+        if cached and response.status_code == 304:
+            metrics.count('cache_hits')
+            cache.refresh(url, cached[0])
+            return cached[1]
+        response.raise_for_status()
+        content = response.content
+        metrics.count('bytes', wire_size(response))
+        if cache and response.status_code == 200:
+            cache.store(url, response)
+        return content
+
+class HostRateLimiter:
+    """Space out requests so that each host gets at most `rate_per_host` requests per second"""
+
+    def __init__(self, rate_per_host=None):
+        self.interval = 1.0 / rate_per_host if rate_per_host else 0.0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until the next request slot for the url's host"""
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def fetch_iter(urls, fetch, max_workers=8, rate_per_host=None):
+    """Fetch urls with a bounded worker pool, yielding results in order as soon as each one is ready.
+
+    `fetch` is called with a single url. A failed fetch yields None in its slot.
+    Fetches that have not started yet are cancelled when the caller stops iterating.
+    """
+    urls = list(urls)
+    if not urls:
+        return
+    limiter = HostRateLimiter(rate_per_host)
+    # Workers see the caller's context variables, so their requests count towards the current run
+    context = contextvars.copy_context()
+
+    def worker(url):
+        limiter.wait(url)
+        try:
+            return fetch(url)
+        except Exception:
+            return None
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))))
+    try:
+        futures = [executor.submit(context.copy().run, worker, url) for url in urls]
+        for future in futures:
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def fetch_all(urls, fetch, max_workers=8, rate_per_host=None):
+    """Fetch urls with a bounded worker pool and return results in the same order.
+
+    `fetch` is called with a single url. A failed fetch yields None in its slot.
+    """
+    return list(fetch_iter(urls, fetch, max_workers, rate_per_host))
@@ -0,0 +1,79 @@
+"""
+The normalized feed entry passed from scraping to serialization
+
+Generators yield FeedItem records; dedup, incremental merging and every output format work on
+them. Items round-trip through JSON and, when the msgpack package is installed, msgpack, as
+compact positional rows.
+"""
+
+import json
+from datetime import datetime
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+class FeedItem:
+    """One feed entry.
+
+    `url` is the link to the item, `guid` its permanent ID if it has one other than the link,
+    `summary` the text shown in feed readers, `published` a timezone-aware datetime or None,
+    and `source` the name of the feed that produced it.
+    """
+
+    __slots__ = ('guid', 'url', 'title', 'authors', 'summary', 'categories', 'published', 'source')
+
+    def __init__(self, url, title='', summary='', published=None, guid=None, authors=(), categories=(), source=None):
+        self.guid = guid
+        self.url = url
+        self.title = title
+        self.authors = tuple(authors)
+        self.summary = summary
+        self.categories = tuple(categories)
+        self.published = published
+        self.source = source
+
+    @property
+    def key(self):
+        """Identify the item by its GUID, or its link when it has none"""
+        return self.guid or self.url
+
+    def as_row(self):
+        """The item as a list of JSON/msgpack-serializable values, in __slots__ order"""
+        return [
+            self.guid, self.url, self.title, list(self.authors), self.summary, list(self.categories),
+            self.published.isoformat() if self.published else None, self.source,
+        ]
+
+    @classmethod
+    def from_row(cls, row):
+        guid, url, title, authors, summary, categories, published, source = row
+        return cls(url, title, summary, datetime.fromisoformat(published) if published else None,
+                   guid, authors, categories, source)
+
+    def __eq__(self, other):
+        if not isinstance(other, FeedItem):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"FeedItem({self.url!r}, title={self.title!r}, published={self.published!r})"
+
+def dumps_json(items):
+    """Serialize items to a JSON array of rows"""
+    return json.dumps([item.as_row() for item in items], ensure_ascii=False, separators=(',', ':'))
+
+def loads_json(text):
+    return [FeedItem.from_row(row) for row in json.loads(text)]
+
+def dumps_msgpack(items):
+    """Serialize items to msgpack; requires the msgpack package"""
+    if msgpack is None:
+        raise ImportError("msgpack serialization requires the msgpack package")
+    return msgpack.packb([item.as_row() for item in items], use_bin_type=True)
+
+def loads_msgpack(data):
+    if msgpack is None:
+        raise ImportError("msgpack serialization requires the msgpack package")
+    return [FeedItem.from_row(row) for row in msgpack.unpackb(data, raw=False)]
@@ -0,0 +1,194 @@
+"""
+Per-generator run metrics: stage timings, HTTP counters and emitted entries
+"""
+
+import contextvars
+import cProfile
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from feed_generators.store import write_atomic
+
+STAGES = ('fetch', 'parse', 'extract', 'dates', 'write', 'route', 'archive')
+COUNTERS = ('requests', 'bytes', 'cache_hits', 'entries')
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+class GeneratorMetrics:
+    """Metrics of one generator run.
+
+    Stage time is exclusive: time spent in a stage nested inside another one
+    (dates inside extract, for example) is only counted for the inner stage.
+    Fetch time is summed over requests, so concurrent fetches can add up to
+    more than the wall time.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.duration = 0.0
+        self.success = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def count(self, counter, value=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def as_dict(self):
+        return {
+            'success': self.success,
+            'duration': self.duration,
+            'stages': dict(self.stages),
+            **self.counters,
+        }
+
+_current = contextvars.ContextVar('feed_metrics', default=None)
+_runs = {}  # latest run of each generator, so a long-running process does not accumulate them
+_runs_lock = threading.Lock()
+
+def current():
+    """Return the metrics of the generator running in this context, or None"""
+    return _current.get()
+
+@contextmanager
+def collect(name):
+    """Collect the metrics of a generator run; the run counts as failed if the block raises"""
+    run = GeneratorMetrics(name)
+    with _runs_lock:
+        _runs[name] = run
+    token = _current.set(run)
+    start = time.perf_counter()
+    try:
+        yield run
+        if run.success is None:
+            run.success = True
+    except BaseException:
+        run.success = False
+        raise
+    finally:
+        run.duration = time.perf_counter() - start
+        _current.reset(token)
+
+@contextmanager
+def stage(name):
+    """Time a stage of the current generator run; does nothing outside of collect()"""
+    run = _current.get()
+    if run is None:
+        yield
+        return
+    stack = run._stack()
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        run.add_time(name, elapsed - stack.pop())
+        if stack:
+            stack[-1] += elapsed
+
+def count(counter, value=1):
+    """Add to a counter of the current generator run"""
+    run = _current.get()
+    if run is not None:
+        run.count(counter, value)
+
+def runs():
+    with _runs_lock:
+        return list(_runs.values())
+
+def reset():
+    with _runs_lock:
+        _runs.clear()
+
+def build_report(wall_time=None):
+    """Build the run report of every generator collected so far"""
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'wall_time': wall_time,
+        'generators': {run.name: run.as_dict() for run in runs()},
+    }
+
+def write_report(path, wall_time=None):
+    """Write the run report as JSON"""
+    write_atomic(path, json.dumps(build_report(wall_time), indent=2) + '\n')
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_text(wall_time=None):
+    """Render the collected metrics in the Prometheus text exposition format"""
+    metrics = [
+        ('feed_generator_success', "1 if the generator finished without error", lambda run: [({}, int(bool(run.success)))]),
+        ('feed_generator_duration_seconds', "Wall time of the generator run", lambda run: [({}, run.duration)]),
+        ('feed_generator_stage_seconds', "Time spent in each stage of the generator run",
+         lambda run: [({'stage': name}, seconds) for name, seconds in run.stages.items()]),
+        ('feed_generator_requests', "HTTP requests made", lambda run: [({}, run.counters['requests'])]),
+        ('feed_generator_bytes', "Bytes of response bodies downloaded, before decompression", lambda run: [({}, run.counters['bytes'])]),
+        ('feed_generator_cache_hits', "Requests answered from the HTTP cache", lambda run: [({}, run.counters['cache_hits'])]),
+        ('feed_generator_entries', "Entries written to the feed", lambda run: [({}, run.counters['entries'])]),
+    ]
+
+    lines = []
+    collected = runs()
+    for metric, help_text, samples in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for run in collected:
+            for labels, value in samples(run):
+                labels = dict({'generator': run.name}, **labels)
+                label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+                lines.append(f"{metric}{{{label_text}}} {value}")
+
+    lines.append("# HELP feed_run_timestamp_seconds Unix time the run finished")
+    lines.append("# TYPE feed_run_timestamp_seconds gauge")
+    lines.append(f"feed_run_timestamp_seconds {time.time():.3f}")
+    if wall_time is not None:
+        lines.append("# HELP feed_run_duration_seconds Wall time of the whole run")
+        lines.append("# TYPE feed_run_duration_seconds gauge")
+        lines.append(f"feed_run_duration_seconds {wall_time}")
+    return '\n'.join(lines) + '\n'
+
+def write_prometheus(path, wall_time=None):
+    """Write the metrics for the node_exporter textfile collector, replacing the file atomically"""
+    write_atomic(path, prometheus_text(wall_time))
+
+@contextmanager
+def profile(name, directory, profiler='cprofile'):
+    """Profile the block and save the result as <directory>/<name>.prof (cProfile) or .html (pyinstrument)"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    if profiler == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            (directory / f"{name}.html").write_text(profiler.output_html(), encoding='utf-8')
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(directory / f"{name}.prof")
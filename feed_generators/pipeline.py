@@ -0,0 +1,193 @@
+"""
+Shared scraping pipeline: fetch → parse → select candidates → extract fields → resolve dates → emit
+"""
+
+import sqlite3
+from datetime import timezone
+
+from feed_generators import archive, metrics, routing
+from feed_generators.date_utils import clean_title, extract_date_from_element, get_fallback_date
+from feed_generators.feed_writer import load_feed_entries, write_feed
+from feed_generators.first_seen import assign_fallback_dates
+from feed_generators.html_utils import make_soup
+from feed_generators.http_utils import fetch
+from feed_generators.items import FeedItem
+
+def select_all(element, selector):
+    """Return every match of a selector: a CSS selector, a (name, attrs) pair for find_all() or a callable"""
+    if callable(selector):
+        return list(selector(element))
+    if isinstance(selector, str):
+        return element.select(selector)
+    name, attrs = selector
+    return element.find_all(name, attrs)
+
+def select_first(element, selectors, link=None):
+    """Return the first match of a list of selectors; callables get the candidate and its link element"""
+    for selector in selectors:
+        if callable(selector):
+            match = selector(element, link)
+        elif isinstance(selector, str):
+            match = element.select_one(selector)
+        else:
+            name, attrs = selector
+            match = element.find(name, attrs)
+        if match is not None:
+            return match
+    return None
+
+def candidate_link(element, link=None):
+    """The candidate itself if it is a link, otherwise the first link inside it"""
+    return element if element.name == 'a' else element.find('a', href=True)
+
+class Source:
+    """How a feed is scraped from its listing page.
+
+    Candidates are the matches of the first selector in `candidates` that finds anything, up to
+    the feed's entry limit. From each candidate the link, title and description are taken with
+    their selectors (or a callable for the description) and the date with the first function in
+    `dates` that returns one. `resolve_dates` can then fill in dates for all entries at once, e.g.
+    from article pages, and `fallback_date(index)` dates whatever is left the first time it is
+    seen (see first_seen.py). If no candidate yields an entry, the links matched by
+    `fallback_links` are used instead.
+
+    Entries are FeedItem records tagged with the feed's name. Sources with a structured listing
+    can give `entries`, a function yielding them from the parsed document, instead of the
+    candidate selectors. `max_entries` and `incremental`
+    override the feed's entry limit and the FEED_INCREMENTAL setting.
+    """
+
+    def __init__(self, feed, channel, candidates=(), link=(candidate_link,), title=(), description=(),
+                 default_title="Untitled", clean_titles=True, base_url='',
+                 dates=(extract_date_from_element,), resolve_dates=None, fallback_date=get_fallback_date,
+                 fallback_links=None, fallback_limit=None, fallback_title="Untitled",
+                 entries=None, fetch=None, parse=None, parse_only=None, max_entries=None, incremental=None):
+        self.feed = feed
+        self.channel = dict({'link': feed.url, 'language': 'en'}, **channel)
+        self.candidates = candidates
+        self.link = link
+        self.title = title
+        self.description = description
+        self.default_title = default_title
+        self.clean_titles = clean_titles
+        self.base_url = base_url
+        self.dates = dates
+        self.resolve_dates = resolve_dates
+        self.fallback_date = fallback_date
+        self.fallback_links = fallback_links
+        self.fallback_limit = fallback_limit or feed.max_entries
+        self.fallback_title = fallback_title
+        self.entries = entries
+        self.fetch = fetch
+        self.parse = parse
+        self.parse_only = parse_only
+        self.max_entries = max_entries or feed.max_entries
+        self.incremental = incremental
+
+    def normalize_url(self, url):
+        """Make a relative link absolute"""
+        if not url.startswith('http'):
+            url = f"{self.base_url}{url}"
+        return url
+
+    def fetch_content(self):
+        return (self.fetch or fetch)(self.feed.url)
+
+    def parse_content(self, content):
+        if self.parse:
+            return self.parse(content)
+        return make_soup(content, parse_only=self.parse_only)
+
+    def select_candidates(self, document):
+        for selector in self.candidates:
+            candidates = select_all(document, selector)
+            if candidates:
+                return candidates[:self.max_entries]
+        return []
+
+    def extract_date(self, element, url):
+        for date_function in self.dates:
+            pub_date = date_function(element, url)
+            if pub_date:
+                # Ensure timezone is set
+                if pub_date.tzinfo is None:
+                    pub_date = pub_date.replace(tzinfo=timezone.utc)
+                return pub_date
+        return None
+
+    def extract_entries(self, document, seen_links):
+        """Yield an entry for each candidate, skipping candidates without a new link"""
+        for element in self.select_candidates(document):
+            link_elem = select_first(element, self.link)
+            if not link_elem or not link_elem.get('href'):
+                continue
+
+            url = self.normalize_url(link_elem['href'])
+            if url in seen_links:
+                continue
+            seen_links.add(url)
+
+            title_elem = select_first(element, self.title, link_elem) or link_elem
+            title = title_elem.get_text(strip=True) if title_elem else self.default_title
+            if self.clean_titles:
+                # Remove dates that might have been included
+                title = clean_title(title)
+
+            if callable(self.description):
+                description = self.description(element, link_elem)
+            else:
+                desc_elem = select_first(element, self.description, link_elem)
+                description = desc_elem.get_text(strip=True) if desc_elem else ""
+
+            yield FeedItem(url, title, description, self.extract_date(element, url), source=self.feed.name)
+
+    def extract_fallback_entries(self, document, seen_links):
+        """Yield undated entries for bare links, used when no candidate yields an entry"""
+        for link in select_all(document, self.fallback_links)[:self.fallback_limit]:
+            url = self.normalize_url(link['href'])
+            if url in seen_links:
+                continue
+            seen_links.add(url)
+
+            yield FeedItem(url, link.get_text(strip=True) or self.fallback_title, source=self.feed.name)
+
+    def generate(self, **resolve_options):
+        """Run the pipeline and write the feed; keyword arguments are passed on to resolve_dates"""
+        document = self.parse_content(self.fetch_content())
+
+        with metrics.stage('extract'):
+            if self.entries:
+                entries = list(self.entries(document))
+            else:
+                seen_links = set()
+                entries = list(self.extract_entries(document, seen_links))
+
+        fallback_date = self.fallback_date
+        if not self.entries:
+            if self.resolve_dates and entries:
+                self.resolve_dates(entries, **resolve_options)
+
+            if not entries and self.fallback_links:
+                with metrics.stage('extract'):
+                    entries = list(self.extract_fallback_entries(document, seen_links))
+                fallback_date = get_fallback_date
+
+        # If still no date, use decreasing time offset for ordering (newest first)
+        with metrics.stage('dates'):
+            assign_fallback_dates(entries, fallback_date, self.feed.name, lambda: load_feed_entries(self.feed.output))
+
+        write_feed(self.feed.output, self.channel, entries, incremental=self.incremental, max_entries=self.max_entries)
+        if routing.ROUTES:
+            routing.write_routes(self.feed, self.channel, entries, incremental=self.incremental, max_entries=self.max_entries)
+
+        if archive.ARCHIVE and entries:
+            with metrics.stage('archive'):
+                try:
+                    archived = archive.archive_entries(entries)
+                except sqlite3.Error as e:
+                    # The feed is written; a locked or broken archive only loses this run's history
+                    print(f"✗ Could not archive entries: {e}")
+                else:
+                    if archived:
+                        print(f"Archived {archived} new or changed entries")
+        return entries
@@ -0,0 +1,214 @@
+"""
+Registry of the feeds this project generates
+
+Generator modules are imported only when their feed is run, so selecting one feed
+does not load the others. Routes are sub-feeds of a feed's entries, written in the
+same run (see routing.py), category feeds are the arXiv categories written together
+with ARXIV_SOURCE=categories, and saved searches are feeds built from the entry archive
+(see archive.py) instead of a source page.
+"""
+
+import importlib
+import os
+import re
+
+class FeedDefinition:
+    """Where a feed comes from, where it is written and how often it is refreshed"""
+
+    def __init__(self, name, url, output, max_entries, interval=3600, module=None):
+        self.name = name
+        self.url = url
+        self.output = output
+        self.max_entries = max_entries
+        self.interval = interval  # seconds between runs in daemon mode
+        self.module = module or f'feed_generators.{name}'
+
+    def load(self):
+        """Import the generator module and return its generate_feed()"""
+        return importlib.import_module(self.module).generate_feed
+
+    def __repr__(self):
+        return f"FeedDefinition({self.name!r})"
+
+FEEDS = [
+    FeedDefinition(
+        'arxiv_cs_ai',
+        url='https://arxiv.org/list/cs.AI/recent?skip=0&show=500',
+        output='feed_arxiv_cs_ai.xml',
+        max_entries=500,
+        interval=4 * 3600,  # new papers are announced once a day
+    ),
+    FeedDefinition(
+        'deepmind_blog',
+        url='https://deepmind.google/blog/',
+        output='feed_deepmind_blog.xml',
+        max_entries=50,
+        interval=3 * 3600,
+    ),
+    FeedDefinition(
+        'deepmind_publications',
+        url='https://deepmind.google/research/publications/',
+        output='feed_deepmind_publications.xml',
+        max_entries=30,
+        interval=12 * 3600,
+    ),
+]
+
+class Route:
+    """A sub-feed of a feed: its entries in any of `subjects` or mentioning any of `keywords`"""
+
+    def __init__(self, name, feed, output, title, subjects=(), keywords=(), description=None, max_entries=None):
+        self.name = name
+        self.feed = feed  # name of the feed whose entries are routed
+        self.output = output
+        self.title = title
+        self.subjects = tuple(subjects)  # categories, or arXiv subject codes such as cs.LG
+        self.keywords = tuple(keywords)  # words or phrases in the title or summary
+        self.description = description or title
+        self.max_entries = max_entries  # defaults to the feed's limit
+
+    def __repr__(self):
+        return f"Route({self.name!r})"
+
+ROUTES = [
+    Route(
+        'arxiv_cs_ai_cs_lg',
+        feed='arxiv_cs_ai',
+        output='feed_arxiv_cs_ai_cs_lg.xml',
+        title='arXiv cs.AI cross-listed in cs.LG (Machine Learning)',
+        subjects=['cs.LG'],
+    ),
+    Route(
+        'arxiv_cs_ai_cs_cl',
+        feed='arxiv_cs_ai',
+        output='feed_arxiv_cs_ai_cs_cl.xml',
+        title='arXiv cs.AI cross-listed in cs.CL (Computation and Language)',
+        subjects=['cs.CL'],
+    ),
+    Route(
+        'arxiv_cs_ai_agents',
+        feed='arxiv_cs_ai',
+        output='feed_arxiv_cs_ai_agents.xml',
+        title='arXiv cs.AI: agents',
+        subjects=['cs.MA'],
+        keywords=['agent', 'agents', 'agentic', 'multi-agent', 'tool use'],
+    ),
+    Route(
+        'arxiv_cs_ai_reinforcement_learning',
+        feed='arxiv_cs_ai',
+        output='feed_arxiv_cs_ai_reinforcement_learning.xml',
+        title='arXiv cs.AI: reinforcement learning',
+        keywords=['reinforcement learning', 'RLHF', 'reward model', 'policy optimization'],
+    ),
+]
+
+class CategoryFeeds:
+    """arXiv categories whose listings a feed's generator fetches together with ARXIV_SOURCE=categories,
+    writing a feed for each category and a combined feed of all their papers.
+    The papers of `routed_category` are also written to the routes of the feed."""
+
+    def __init__(self, feed, categories, combined_output, routed_category=None):
+        self.feed = feed  # name of the feed whose generator writes them
+        self.categories = list(dict.fromkeys(category for category in categories if category))
+        self.combined_output = combined_output
+        self.routed_category = routed_category
+
+    def output(self, category):
+        """feed_arxiv_cs_lg.xml for cs.LG"""
+        return f"feed_arxiv_{re.sub(r'[^a-z0-9]+', '_', category.lower())}.xml"
+
+    def outputs(self):
+        return [self.output(category) for category in self.categories] + [self.combined_output]
+
+    def __repr__(self):
+        return f"CategoryFeeds({self.feed!r}, {self.categories!r})"
+
+CATEGORY_FEEDS = [
+    CategoryFeeds(
+        'arxiv_cs_ai',
+        categories=re.split(r'[\s,]+', os.environ.get('ARXIV_CATEGORIES', 'cs.AI,cs.LG,cs.CL,stat.ML')),
+        combined_output=os.environ.get('ARXIV_COMBINED_OUTPUT', 'feed_arxiv_combined.xml'),
+        routed_category='cs.AI',
+    ),
+]
+
+class SavedSearch:
+    """A feed of the archived entries matching an FTS5 query (see archive.search())"""
+
+    def __init__(self, name, query, output, title, link, description=None, source=None, category=None,
+                 days=None, max_entries=100):
+        self.name = name
+        self.query = query
+        self.output = output
+        self.title = title
+        self.link = link
+        self.description = description or f"Archived entries matching {query}"
+        self.source = source  # only entries of this feed
+        self.category = category  # only entries in this category
+        self.days = days  # only entries published in the last days
+        self.max_entries = max_entries
+
+    def __repr__(self):
+        return f"SavedSearch({self.name!r})"
+
+SEARCHES = [
+    SavedSearch(
+        'arxiv_reinforcement_learning',
+        query='"reinforcement learning"',
+        output='feed_search_arxiv_reinforcement_learning.xml',
+        title='arXiv cs.AI: reinforcement learning',
+        link='https://arxiv.org/list/cs.AI/recent',
+        description='Papers on reinforcement learning in arXiv cs.AI from the last 30 days',
+        source='arxiv_cs_ai',
+        category='cs.AI',
+        days=30,
+    ),
+]
+
+_feeds_by_name = {feed.name: feed for feed in FEEDS}
+_searches_by_name = {saved_search.name: saved_search for saved_search in SEARCHES}
+
+def feed_names():
+    return [feed.name for feed in FEEDS]
+
+def get_feed(name):
+    """Return the definition of a feed by name"""
+    try:
+        return _feeds_by_name[name]
+    except KeyError:
+        raise ValueError(f"Unknown feed {name!r}, expected one of: {', '.join(feed_names())}") from None
+
+def select_feeds(names=None):
+    """Return the definitions of the named feeds, or of all feeds, in registry order"""
+    if not names:
+        return list(FEEDS)
+    selected = {get_feed(name).name for name in names}
+    return [feed for feed in FEEDS if feed.name in selected]
+
+def search_names():
+    return [saved_search.name for saved_search in SEARCHES]
+
+def select_searches(names=None):
+    """Return the named saved searches, or all of them, in registry order"""
+    if not names:
+        return list(SEARCHES)
+    unknown = [name for name in names if name not in _searches_by_name]
+    if unknown:
+        raise ValueError(f"Unknown saved search {unknown[0]!r}, expected one of: {', '.join(search_names())}")
+    return [saved_search for saved_search in SEARCHES if saved_search.name in names]
+
+def routes_for(feed_name):
+    """Return the routes of a feed, in registry order"""
+    return [route for route in ROUTES if route.feed == feed_name]
+
+def category_feeds_for(feed_name):
+    """Return the category feeds a feed's generator can write, or None"""
+    return next((category_feeds for category_feeds in CATEGORY_FEEDS if category_feeds.feed == feed_name), None)
+
+def outputs_for(feed):
+    """Every file a feed's generator can write: the feed, its routes and its category feeds"""
+    outputs = [feed.output] + [route.output for route in routes_for(feed.name)]
+    category_feeds = category_feeds_for(feed.name)
+    if category_feeds:
+        outputs += category_feeds.outputs()
+    return list(dict.fromkeys(outputs))
@@ -0,0 +1,110 @@
+"""
+Routing a feed's entries into sub-feeds by subject and keyword in one pass
+
+The subjects of all routes of a feed go into one dictionary and their keywords into one trie of
+words, so each entry is matched by looking up its categories and walking its words once, however
+many routes there are.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+from feed_generators import metrics, registry
+from feed_generators.feed_writer import write_feed
+
+ROUTES = os.environ.get('FEED_ROUTES', '1') == '1'
+
+WORD_RE = re.compile(r'\w+')
+# arXiv subjects read "Machine Learning (cs.LG)" on listing pages and "cs.LG" in the API
+SUBJECT_CODE_RE = re.compile(r'\(([^()]+)\)\s*$')
+
+# Key of the route indexes in a trie node; never a word
+END = ''
+
+def words(text):
+    return WORD_RE.findall(text.lower())
+
+def subject_keys(category):
+    """A category and its subject code, if it has one, normalized for lookup"""
+    category = category.strip().lower()
+    match = SUBJECT_CODE_RE.search(category)
+    return (category, match.group(1).strip()) if match else (category,)
+
+class Router:
+    """Match entries against the subjects and keywords of many routes.
+
+    A route takes an entry that has any of its subjects among its categories, or any of its
+    keywords as whole words, case-insensitive, in its title or summary. Keywords are matched
+    word by word, so "multi-agent" also matches "multi agent".
+    """
+
+    def __init__(self, routes):
+        self.routes = list(routes)
+        self.subjects = {}  # subject -> indexes of the routes
+        self.keywords = {}  # trie of keyword words; END holds the indexes of the routes
+        for index, route in enumerate(self.routes):
+            for subject in route.subjects:
+                for key in subject_keys(subject):
+                    self.subjects.setdefault(key, set()).add(index)
+            for keyword in route.keywords:
+                tokens = words(keyword)
+                if not tokens:
+                    raise ValueError(f"Route {route.name!r} has a keyword without words: {keyword!r}")
+                node = self.keywords
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(END, set()).add(index)
+
+    def match(self, entry):
+        """Indexes of the routes an entry belongs to"""
+        matched = set()
+        for category in entry.categories:
+            for key in subject_keys(category):
+                matched.update(self.subjects.get(key, ()))
+
+        if self.keywords:
+            tokens = words(f"{entry.title}\n{entry.summary}")
+            root = self.keywords
+            for start, token in enumerate(tokens):
+                node = root.get(token)
+                position = start + 1
+                while node is not None:
+                    if END in node:
+                        matched.update(node[END])
+                    if position == len(tokens):
+                        break
+                    node = node.get(tokens[position])
+                    position += 1
+        return matched
+
+    def route(self, entries):
+        """The entries of each route, in the given order"""
+        routed = [[] for _ in self.routes]
+        for entry in entries:
+            for index in self.match(entry):
+                routed[index].append(entry)
+        return dict(zip(self.routes, routed))
+
+@lru_cache(maxsize=None)
+def router_for(feed_name):
+    return Router(registry.routes_for(feed_name))
+
+def write_routes(feed, channel, entries, incremental=None, max_entries=None):
+    """Write the sub-feeds of a feed from its entries; returns the entries of each route.
+
+    A route that matches no entries is not written, so no empty sub-feed is created and the
+    last one written is kept.
+    """
+    router = router_for(feed.name)
+    if not router.routes:
+        return {}
+    with metrics.stage('route'):
+        routed = router.route(entries)
+    for route, matched in routed.items():
+        if not matched:
+            continue
+        route_channel = dict(channel, title=route.title, description=route.description)
+        write_feed(route.output, route_channel, matched, incremental=incremental,
+                   max_entries=route.max_entries or max_entries, count=False)
+    return routed
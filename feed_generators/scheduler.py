@@ -0,0 +1,100 @@
+"""
+Long-running scheduler that refreshes each feed on its own interval
+"""
+
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+JITTER = float(os.environ.get('FEED_DAEMON_JITTER', '0.1'))  # +/- fraction of each delay
+RETRY_DELAY = float(os.environ.get('FEED_DAEMON_RETRY', '300'))  # seconds before the first retry after a failure
+MAX_BACKOFF = float(os.environ.get('FEED_DAEMON_MAX_BACKOFF', '21600'))  # longest wait between retries
+
+# Longest time the loop waits before checking for a stop request
+POLL_INTERVAL = 1.0
+
+def next_delay(interval, failures=0, jitter=JITTER, retry_delay=RETRY_DELAY, max_backoff=MAX_BACKOFF, rng=random):
+    """Seconds until a feed's next run: its interval, or after `failures` failures in a row an exponential backoff"""
+    if failures:
+        delay = min(retry_delay * 2 ** (failures - 1), max_backoff)
+    else:
+        delay = interval
+    return delay * (1 + rng.uniform(-jitter, jitter))
+
+class Scheduler:
+    """Run `run(feed)` for each feed every `feed.interval` seconds, at most `jobs` at a time.
+
+    A feed is put back in the queue only when its run has finished, so the same feed never
+    runs twice at once. `run` returns True on success; failures are retried with exponential
+    backoff. `on_run(feed, success, delay)` is called after every run, from the scheduler thread.
+    """
+
+    def __init__(self, feeds, run, jobs=1, jitter=JITTER, retry_delay=RETRY_DELAY, max_backoff=MAX_BACKOFF,
+                 on_run=None, clock=time.monotonic, rng=random):
+        self.run = run
+        self.jobs = max(1, jobs)
+        self.jitter = jitter
+        self.retry_delay = retry_delay
+        self.max_backoff = max_backoff
+        self.on_run = on_run
+        self.clock = clock
+        self.rng = rng
+        self.failures = {feed.name: 0 for feed in feeds}
+        self.completed = 0
+        self._stop = threading.Event()
+        self._order = itertools.count()
+
+        # Every feed is due right away, in registry order
+        now = clock()
+        self.queue = [(now, next(self._order), feed) for feed in feeds]
+        heapq.heapify(self.queue)
+
+    def stop(self):
+        """Stop starting runs; runs in progress are finished"""
+        self._stop.set()
+
+    def _schedule(self, feed, success):
+        self.failures[feed.name] = 0 if success else self.failures[feed.name] + 1
+        delay = next_delay(feed.interval, self.failures[feed.name], self.jitter, self.retry_delay,
+                           self.max_backoff, self.rng)
+        heapq.heappush(self.queue, (self.clock() + delay, next(self._order), feed))
+        return delay
+
+    def _run(self, feed):
+        try:
+            return bool(self.run(feed))
+        except Exception as e:
+            print(f"✗ Error running {feed.name}: {e}")
+            return False
+
+    def run_forever(self, max_runs=None):
+        """Run feeds as they come due until stop() is called, or until `max_runs` runs have finished"""
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while not self._stop.is_set():
+                now = self.clock()
+                while self.queue and self.queue[0][0] <= now and len(running) < self.jobs:
+                    _, _, feed = heapq.heappop(self.queue)
+                    running[executor.submit(self._run, feed)] = feed
+
+                timeout = POLL_INTERVAL
+                if self.queue and len(running) < self.jobs:
+                    timeout = min(timeout, max(0.0, self.queue[0][0] - now))
+                if not running:
+                    self._stop.wait(timeout)
+                    continue
+
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    feed = running.pop(future)
+                    success = future.result()
+                    delay = self._schedule(feed, success)
+                    self.completed += 1
+                    if self.on_run:
+                        self.on_run(feed, success, delay)
+                if max_runs is not None and self.completed >= max_runs:
+                    self.stop()
@@ -0,0 +1,247 @@
+"""
+Serving the generated feed files over HTTP from memory
+
+Each version of a feed file is read and compressed once, when it is loaded, or its compressed
+copies are taken from the writer (FEED_COMPRESS); a poll is a dictionary lookup and, when the
+reader already has the current version, a 304 without a body.
+"""
+
+import hashlib
+import os
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from feed_generators import feed_writer, registry
+from feed_generators.feed_writer import FORMATS, brotli, compress, compressed_path, output_paths, page_path
+
+SERVER_MAX_AGE = int(os.environ.get('FEED_SERVER_MAX_AGE', '300'))  # Cache-Control max-age, seconds
+RELOAD_INTERVAL = float(os.environ.get('FEED_SERVER_RELOAD', '5'))  # seconds between checks for rewritten feeds
+
+CONTENT_TYPES = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+
+# Content codings offered to clients, in order of preference, and the compressed copies they are read from
+ENCODINGS = {'br': 'br', 'gzip': 'gz'}
+
+class FeedFile:
+    """One version of a feed file in memory: its body in each encoding, its ETag and modification time"""
+
+    __slots__ = ('path', 'content_type', 'version', 'digest', 'mtime', 'last_modified', 'bodies')
+
+    def __init__(self, path, content_type):
+        self.path = Path(path)
+        self.content_type = content_type
+        # Generators replace feed files with os.replace(), so an open file is always one complete version
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+        self.version = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self.digest = hashlib.sha256(data).hexdigest()[:32]
+        self.mtime = int(stat.st_mtime)
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        self.bodies = {'identity': data}
+        for encoding, compression in ENCODINGS.items():
+            body = self.compressed_body(data, compression)
+            if body is not None and len(body) < len(data):
+                self.bodies[encoding] = body
+
+    def compressed_body(self, data, compression):
+        """The compressed copy written next to the file for this version if there is one, else data compressed now"""
+        try:
+            with open(compressed_path(self.path, compression), 'rb') as f:
+                copy_mtime = os.fstat(f.fileno()).st_mtime_ns
+                body = f.read()
+            # The writer compresses a feed after renaming it into place: a newer copy is of this
+            # version as long as the feed has not been replaced since it was read
+            stat = os.stat(self.path)
+            if copy_mtime > self.version[2] and (stat.st_ino, stat.st_size, stat.st_mtime_ns) == self.version:
+                return body
+        except OSError:
+            pass
+        if compression == 'br' and brotli is None:
+            return None
+        return compress(data, compression)
+
+    def etag(self, encoding):
+        """A strong ETag per encoding, as the encoded bodies are different representations"""
+        if encoding == 'identity':
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def not_modified(self, if_none_match, if_modified_since):
+        """Whether the reader's copy is current; If-None-Match takes precedence over If-Modified-Since"""
+        if if_none_match is not None:
+            for tag in if_none_match.split(','):
+                tag = tag.strip()
+                if tag == '*':
+                    return True
+                # Weak comparison, ignoring the encoding suffix: every encoding has the same content
+                tag = tag[2:] if tag.startswith('W/') else tag
+                if tag.strip('"').split('-', 1)[0] == self.digest:
+                    return True
+            return False
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= self.mtime
+            except (TypeError, ValueError, OverflowError):
+                return False
+        return False
+
+    def __repr__(self):
+        return f"FeedFile({str(self.path)!r}, {', '.join(self.bodies)})"
+
+@lru_cache(maxsize=256)
+def accepted_encodings(accept_encoding):
+    """Encodings of ENCODINGS an Accept-Encoding header allows, in order of preference"""
+    weights = {}
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip()] = weight
+    return tuple(encoding for encoding in ENCODINGS if weights.get(encoding, weights.get('*', 0.0)) > 0)
+
+def choose_encoding(accept_encoding, bodies):
+    for encoding in accepted_encodings(accept_encoding or ''):
+        if encoding in bodies:
+            return encoding
+    return 'identity'
+
+class FeedStore:
+    """The served feed files by URL path, reloaded when a generator replaces a file.
+
+    `paths` maps URL paths to (file path, content type). A reload builds a new mapping and swaps it
+    in with one assignment, so a request sees either the old or the new version of a feed, whole.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.files = {}
+        self._lock = threading.Lock()  # one reload at a time
+        self.reload()
+
+    def get(self, url_path):
+        return self.files.get(url_path)
+
+    def reload(self):
+        """Load the feed files that are new or were replaced since the last check; returns their URL paths"""
+        with self._lock:
+            files = dict(self.files)
+            changed = []
+            for url_path, (path, content_type) in self.paths.items():
+                current = files.get(url_path)
+                try:
+                    stat = os.stat(path)
+                    if current and current.version == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                        continue
+                    files[url_path] = FeedFile(path, content_type)
+                except FileNotFoundError:
+                    if files.pop(url_path, None) is None:
+                        continue
+                except OSError as e:
+                    print(f"✗ Could not load {path}: {e}")
+                    continue
+                changed.append(url_path)
+            self.files = files
+            return changed
+
+def feed_store(feeds):
+    """A store serving every format of the given feeds, their routes and category feeds, and of their pages
+    with FEED_PAGE_SIZE, at /<file name>; files not written yet are 404s until they are"""
+    page_size = feed_writer.selected_page_size()
+    paths = {}
+    for feed in feeds:
+        max_entries = feed_writer.MAX_ENTRIES or feed.max_entries
+        outputs = registry.outputs_for(feed)
+        feed_paths = list(outputs)
+        if page_size:
+            feed_paths += [page_path(output, number) for output in outputs
+                           for number in range(1, -(-max_entries // page_size) + 1)]
+        for feed_path in feed_paths:
+            for name, path in output_paths(feed_path, list(FORMATS)).items():
+                paths[f'/{path.name}'] = (path, CONTENT_TYPES[name])
+    return FeedStore(paths)
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive for readers polling several feeds
+    server_version = 'feed-server'
+    # Headers and body are written separately; without this a small body waits for the delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_feed()
+
+    def do_HEAD(self):
+        self.send_feed(head=True)
+
+    def send_feed(self, head=False):
+        feed = self.server.store.get(self.path.split('?', 1)[0])
+        if feed is None:
+            body = b'Not found\n'
+            self.send_response(404)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+            return
+
+        encoding = choose_encoding(self.headers.get('Accept-Encoding'), feed.bodies)
+        if feed.not_modified(self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since')):
+            self.send_response(304)
+            self.send_cache_headers(feed, encoding)
+            self.end_headers()
+            return
+
+        body = feed.bodies[encoding]
+        self.send_response(200)
+        self.send_header('Content-Type', feed.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_cache_headers(feed, encoding)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def send_cache_headers(self, feed, encoding):
+        self.send_header('ETag', feed.etag(encoding))
+        self.send_header('Last-Modified', feed.last_modified)
+        self.send_header('Cache-Control', f'public, max-age={SERVER_MAX_AGE}')
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class FeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store, verbose=False):
+        super().__init__(address, FeedRequestHandler)
+        self.store = store
+        self.verbose = verbose
+
+def parse_address(value):
+    """[HOST:]PORT to a (host, port) pair; the host defaults to all interfaces"""
+    host, _, port = value.rpartition(':')
+    return host.strip('[]'), int(port)
+
+def start_server(store, address, verbose=False):
+    """Serve the store from a background thread; stop with server.shutdown()"""
+    server = FeedServer(address, store, verbose)
+    threading.Thread(target=server.serve_forever, name='feed-server', daemon=True).start()
+    return server
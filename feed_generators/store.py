@@ -0,0 +1,40 @@
+"""
+Small persistence helpers: atomic file writes and a dict of records kept in a JSON file
+"""
+
+import json
+import os
+from pathlib import Path
+
+def write_atomic(path, data):
+    """Write bytes or text to a file through a temporary file renamed over it, so readers never see half of it"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if isinstance(data, str):
+        tmp_path.write_text(data, encoding='utf-8')
+    else:
+        tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+class JsonStore:
+    """Records keyed by string, loaded from a JSON file and written back by save() when `dirty` is set.
+
+    A missing or unreadable file gives an empty store.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.records = {}
+        self.dirty = False
+        try:
+            self.records = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        """Write the store back to disk if anything changed"""
+        if not self.dirty:
+            return
+        write_atomic(self.path, json.dumps(self.records, ensure_ascii=False, indent=1, sort_keys=True))
+        self.dirty = False
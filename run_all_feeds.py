@@ -4,68 +4,230 @@ Run all RSS feed generators
 """
 
 import os
+import signal
 import sys
-import importlib.util
+import threading
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
 
-def run_all_feeds():
-    """Execute all feed generator scripts in feed_generators/ directory"""
-    
-    # Add project root to Python path for absolute imports
-    project_root = Path(__file__).parent
-    if str(project_root) not in sys.path:
-        sys.path.insert(0, str(project_root))
-    
-    feed_generators_dir = project_root / 'feed_generators'
-    
-    if not feed_generators_dir.exists():
-        print(f"Error: {feed_generators_dir} directory not found")
-        sys.exit(1)
-    
-    # Get all Python files in feed_generators directory (excluding __init__.py and utility files)
-    feed_files = [f for f in feed_generators_dir.glob('*.py') 
-                  if f.name not in ['__init__.py', 'date_utils.py']]
-    
-    if not feed_files:
-        print("No feed generator scripts found")
-        sys.exit(1)
-    
-    print(f"Found {len(feed_files)} feed generator(s)")
-    print("-" * 50)
-    
-    success_count = 0
-    error_count = 0
-    
-    for feed_file in sorted(feed_files):
-        print(f"\nRunning: {feed_file.name}")
+# Project root on the path for absolute imports of feed_generators
+sys.path.insert(0, str(Path(__file__).parent))
+
+from feed_generators import metrics, registry, scheduler, server
+
+def run_generator(feed, profile_dir=None, profiler='cprofile'):
+    """Import a feed's generator module and call its generate_feed(), returning (success, elapsed seconds)"""
+    print(f"\nRunning: {feed.name}")
+    start = time.perf_counter()
+    success = False
+    with metrics.collect(feed.name) as run:
         try:
-            # Load and execute the module
-            spec = importlib.util.spec_from_file_location(feed_file.stem, feed_file)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Call the generate_feed function
-            if hasattr(module, 'generate_feed'):
-                module.generate_feed()
-                success_count += 1
-                print(f"✓ Successfully generated feed from {feed_file.name}")
-            else:
-                print(f"✗ {feed_file.name} does not have a generate_feed() function")
-                error_count += 1
-                
+            generate_feed = feed.load()
+            with metrics.profile(feed.name, profile_dir, profiler) if profile_dir else nullcontext():
+                generate_feed()
+            success = True
+            print(f"✓ Successfully generated {feed.output}")
+
         except Exception as e:
-            print(f"✗ Error running {feed_file.name}: {e}")
-            error_count += 1
+            print(f"✗ Error running {feed.name}: {e}")
             import traceback
             traceback.print_exc()
-    
+        run.success = success
+
+    return success, time.perf_counter() - start
+
+def run_all_feeds(jobs=1, only=None, report=None, prometheus=None, profile_dir=None, profiler='cprofile'):
+    """Run the generators of all registered feeds, or only of the named ones"""
+    feeds = registry.select_feeds(only)
+    if not feeds:
+        print("No feeds registered")
+        sys.exit(1)
+
+    jobs = max(1, min(jobs, len(feeds)))
+    if profile_dir:
+        # Profilers hook the interpreter per process or per thread, so profiled generators run one at a time
+        jobs = 1
+
+    print(f"Running {len(feeds)} feed generator(s)" + (f", {jobs} in parallel" if jobs > 1 else ""))
+    print("-" * 50)
+
+    run_one = partial(run_generator, profile_dir=profile_dir, profiler=profiler)
+    start = time.perf_counter()
+    if jobs > 1:
+        # Generators are independent and mostly wait on the network, so threads are enough
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(run_one, feeds))
+    else:
+        results = [run_one(feed) for feed in feeds]
+    total_elapsed = time.perf_counter() - start
+
+    success_count = sum(1 for success, _ in results if success)
+    error_count = len(results) - success_count
+
     print("\n" + "=" * 50)
+    runs = {run.name: run for run in metrics.runs()}
+    for feed, (success, elapsed) in zip(feeds, results):
+        run = runs[feed.name]
+        stages = ' '.join(f"{stage} {seconds:.2f}s" for stage, seconds in run.stages.items() if seconds >= 0.005)
+        print(f"{'✓' if success else '✗'} {feed.name:<30} {elapsed:7.2f}s  "
+              f"{run.counters['entries']} entries, {run.counters['requests']} requests, "
+              f"{run.counters['cache_hits']} cached  {stages}")
+    print(f"Total wall time: {total_elapsed:.2f}s")
     print(f"Summary: {success_count} succeeded, {error_count} failed")
     print("=" * 50)
-    
+
+    if report:
+        metrics.write_report(report, wall_time=total_elapsed)
+        print(f"Run report written to {report}")
+    if prometheus:
+        metrics.write_prometheus(prometheus, wall_time=total_elapsed)
+        print(f"Prometheus metrics written to {prometheus}")
+    if profile_dir:
+        print(f"Profiles written to {profile_dir}")
+
     if error_count > 0:
         sys.exit(1)
 
-if __name__ == "__main__":
-    run_all_feeds()
+def start_feed_server(feeds, address):
+    store = server.feed_store(feeds)
+    feed_server = server.start_server(store, server.parse_address(address))
+    host, port = feed_server.server_address[:2]
+    print(f"Serving {len(store.files)} feed file(s) on http://{host or 'localhost'}:{port}/")
+    return feed_server
 
+def run_server(address, only=None):
+    """Serve the feed files written by separate generator runs, reloading them when they are replaced"""
+    feed_server = start_feed_server(registry.select_feeds(only), address)
+    stopped = threading.Event()
+
+    def stop(signum, frame):
+        print(f"Received signal {signum}, stopping the server")
+        stopped.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopped.wait(server.RELOAD_INTERVAL):
+        for url_path in feed_server.store.reload():
+            print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] Reloaded {url_path}")
+    feed_server.shutdown()
+
+def run_daemon(jobs=1, only=None, report=None, prometheus=None, serve=None):
+    """Keep running, refreshing each feed on its own interval with warm imports, sessions and caches"""
+    feeds = registry.select_feeds(only)
+    if not feeds:
+        print("No feeds registered")
+        sys.exit(1)
+
+    # The server picks up each feed as soon as its run has written it
+    feed_server = start_feed_server(feeds, serve) if serve else None
+
+    def on_run(feed, success, delay):
+        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {'✓' if success else '✗'} {feed.name}, "
+              f"next run in {delay / 60:.0f} min")
+        if feed_server:
+            feed_server.store.reload()
+        if report:
+            metrics.write_report(report)
+        if prometheus:
+            metrics.write_prometheus(prometheus)
+
+    daemon = scheduler.Scheduler(feeds, lambda feed: run_generator(feed)[0], jobs=jobs, on_run=on_run)
+
+    def stop(signum, frame):
+        print(f"Received signal {signum}, stopping after the runs in progress")
+        daemon.stop()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Scheduling {len(feeds)} feed generator(s): "
+          + ', '.join(f"{feed.name} every {feed.interval / 3600:g}h" for feed in feeds))
+    daemon.run_forever()
+    if feed_server:
+        feed_server.shutdown()
+
+def selected_parser():
+    """The HTML parser of FEED_HTML_PARSER; imports BeautifulSoup, so it is only checked when one is given"""
+    from feed_generators import html_utils
+    return html_utils.get_parser()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run all RSS feed generators")
+    parser.add_argument('-j', '--jobs', type=int, default=int(os.environ.get('FEED_JOBS', '1')),
+                        help="number of generators to run in parallel (default: 1)")
+    parser.add_argument('--only', action='append', choices=registry.feed_names(), metavar='NAME',
+                        help="run only this feed; can be repeated (feeds: %(choices)s)")
+    parser.add_argument('--list', action='store_true', help="list the registered feeds and exit")
+    parser.add_argument('--daemon', action='store_true',
+                        help="keep running and refresh each feed on its own interval (see --list)")
+    parser.add_argument('--serve', metavar='[HOST:]PORT', default=os.environ.get('FEED_SERVE'),
+                        help="serve the feed files over HTTP from memory; with --daemon while refreshing them, "
+                             "otherwise reloading files written by other runs")
+    parser.add_argument('--parser', default=os.environ.get('FEED_HTML_PARSER'),
+                        help="HTML parser backend, lxml or html.parser (default: FEED_HTML_PARSER, else lxml if installed)")
+    parser.add_argument('--formats', default=os.environ.get('FEED_FORMATS'),
+                        help="comma-separated feed formats to write: rss, atom, json (default: rss)")
+    parser.add_argument('--compress', default=os.environ.get('FEED_COMPRESS'),
+                        help="also write compressed copies of every feed file: gz, br or gz,br")
+    parser.add_argument('--page-size', default=os.environ.get('FEED_PAGE_SIZE'),
+                        help="also write each feed in pages of this many entries, linked as an RFC 5005 paged feed")
+    parser.add_argument('--report', default=os.environ.get('FEED_REPORT'),
+                        help="write a JSON run report with per-generator stage timings and counters")
+    parser.add_argument('--prometheus', default=os.environ.get('FEED_PROMETHEUS_TEXTFILE'),
+                        help="write the run metrics as a Prometheus textfile (node_exporter textfile collector)")
+    parser.add_argument('--profile', metavar='DIR', default=os.environ.get('FEED_PROFILE_DIR'),
+                        help="profile each generator and save the results to DIR")
+    parser.add_argument('--profiler', choices=metrics.PROFILERS, default=os.environ.get('FEED_PROFILER', 'cprofile'),
+                        help="profiler used with --profile (default: cprofile)")
+    args = parser.parse_args(argv)
+    if args.profile and args.profiler == 'pyinstrument':
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            parser.error("--profiler pyinstrument requires the pyinstrument package")
+    if args.daemon and args.profile:
+        parser.error("--profile cannot be used with --daemon")
+    if args.serve:
+        try:
+            server.parse_address(args.serve)
+        except ValueError:
+            parser.error(f"--serve expects [HOST:]PORT, got {args.serve!r}")
+    from feed_generators import feed_writer
+    for name, value, check in [('FEED_HTML_PARSER', args.parser, selected_parser),
+                               ('FEED_FORMATS', args.formats, feed_writer.selected_formats),
+                               ('FEED_COMPRESS', args.compress, feed_writer.selected_compressions),
+                               ('FEED_PAGE_SIZE', args.page_size, feed_writer.selected_page_size)]:
+        if value:
+            os.environ[name] = value
+            try:
+                check()
+            except ValueError as e:
+                parser.error(str(e))
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.list:
+        for feed in registry.FEEDS:
+            print(f"{feed.name:<24} {feed.output:<32} every {feed.interval}s  {feed.url}")
+            for route in registry.routes_for(feed.name):
+                print(f"  {route.name:<38} {route.output}")
+            category_feeds = registry.category_feeds_for(feed.name)
+            if category_feeds:
+                for category in category_feeds.categories:
+                    print(f"  {category + ' (ARXIV_SOURCE=categories)':<38} {category_feeds.output(category)}")
+                print(f"  {'combined (ARXIV_SOURCE=categories)':<38} {category_feeds.combined_output}")
+        sys.exit(0)
+    if args.daemon:
+        run_daemon(jobs=args.jobs, only=args.only, report=args.report, prometheus=args.prometheus, serve=args.serve)
+        sys.exit(0)
+    if args.serve:
+        run_server(args.serve, only=args.only)
+        sys.exit(0)
+    run_all_feeds(jobs=args.jobs, only=args.only, report=args.report, prometheus=args.prometheus,
+                  profile_dir=args.profile, profiler=args.profiler)